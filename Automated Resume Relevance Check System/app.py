@@ -1,7 +1,18 @@
 # app.py
+import hashlib
+import json
+import time
 import streamlit as st
 import pandas as pd
-from db_utils import init_db, save_result, fetch_results  # ✅ db_utils integrated
+from document_cache import get_raw_text_from_bytes
+from parse_jds import parse_jd_text
+from integrated_pipeline import get_model, match_with_manifest, SCORER_VERSION
+from score_manifest import ScoreManifest, UPLOAD_MANIFEST_FILE
+from job_queue import JobRunner
+import instrumentation
+from db_utils import (  # ✅ db_utils integrated
+    init_db, save_result, query_results, iter_results, summarize_results, distinct_values
+)
 
 # ==============================
 # PAGE CONFIG
@@ -17,6 +28,39 @@ st.set_page_config(
 # ==============================
 init_db()  # Creates results.db and table if not exists
 
+# ==============================
+# CACHED BACKEND RESOURCES
+# ==============================
+BACKGROUND_BATCH_SIZE = 5  # bigger uploads are scored by background workers
+JOB_WORKERS = 2
+JOB_POLL_SECONDS = 2
+
+@st.cache_resource(show_spinner="Loading embedding model...")
+def load_model():
+    # One model per server process, shared by every session and rerun
+    return get_model()
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def extract_upload_text(digest, filename, _data):
+    # Keyed by content hash (underscore args are not hashed by Streamlit);
+    # document_cache also keeps the text on disk across restarts
+    return get_raw_text_from_bytes(_data, filename)
+
+@st.cache_resource
+def get_job_runner():
+    # Worker threads live in the server process, so jobs keep running across reruns and refreshes
+    return JobRunner(workers=JOB_WORKERS).start()
+
+def read_upload(uploaded_file):
+    """(content hash, extracted text) of an uploaded file; text is "" if extraction fails."""
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        return digest, extract_upload_text(digest, uploaded_file.name, data)
+    except Exception as e:
+        st.warning(f"⚠️ Could not read {uploaded_file.name}: {e}")
+        return digest, ""
+
 # ==============================
 # SIDEBAR THEME & LOGIN/SIGNUP PLACEHOLDERS
 # ==============================
@@ -27,6 +71,32 @@ st.sidebar.button("Signup")  # placeholder
 # Dark/Light mode toggle
 theme = st.sidebar.radio("Theme", ["Light", "Dark"])
 
+# Pipeline metrics (recorded for the whole server process while enabled)
+st.sidebar.divider()
+st.sidebar.subheader("📈 Pipeline Metrics")
+instrumentation.enable(st.sidebar.toggle("Record timings & counters", value=instrumentation.is_enabled()))
+if instrumentation.is_enabled():
+    metrics = instrumentation.snapshot()
+    with st.sidebar.expander("Stage timings", expanded=False):
+        if metrics["stages"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(metrics["stages"], orient="index")[["calls", "seconds", "items", "items_per_second"]],
+                use_container_width=True,
+            )
+        else:
+            st.caption("No stages recorded yet; run an analysis.")
+        for cache, rate in metrics["cache_hit_rates"].items():
+            st.caption(f"{cache} hit rate: {rate:.1%}" if rate is not None else f"{cache} hit rate: n/a")
+        for name, obs in metrics["observations"].items():
+            st.caption(f"{name}: mean {obs['mean']:.1f}, max {obs['max']}")
+        st.download_button("📥 JSON snapshot", json.dumps(metrics, indent=2), file_name="pipeline_metrics.json",
+                           mime="application/json")
+        st.download_button("📥 Prometheus text", instrumentation.to_prometheus(metrics),
+                           file_name="pipeline_metrics.prom", mime="text/plain")
+        if st.button("Reset metrics"):
+            instrumentation.reset()
+            st.rerun()
+
 # ==============================
 # COLORS & STYLING
 # ==============================
@@ -100,6 +170,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("📌 Upload Job Description (JD)")
     jd_file = st.file_uploader("Choose a JD file (PDF/TXT/DOCX)", type=["pdf", "txt", "docx"], key="jd_upload")
+    job_location = st.text_input("📍 Job Location", value="Unknown")
 
 with col2:
     st.subheader("📌 Upload Resume(s)")
@@ -118,64 +189,100 @@ st.write("")  # spacing
 analyze_btn = st.button("🚀 Analyze", use_container_width=True)
 
 if analyze_btn:
-    if jd_file and resume_files:
+    if jd_file and resume_files and len(resume_files) > BACKGROUND_BATCH_SIZE:
+        # Large batch: hand it to the job queue and track it through the URL
+        job_id = get_job_runner().submit(
+            jd_file.name,
+            jd_file.getvalue(),
+            [(resume_file.name, resume_file.getvalue()) for resume_file in resume_files],
+            location=job_location,
+        )
+        st.query_params["job"] = job_id
+        st.success(f"🕒 Queued {len(resume_files)} resumes for background analysis. "
+                   "You can keep using the page or refresh it; progress is shown below.")
+    elif jd_file and resume_files:
         high_score_exists = False  # flag for balloons
-        for resume_file in resume_files:
-            # Placeholder scoring (replace with backend integration)
-            score = 85.0
-            verdict = "High"
-            missing_skills = ["Tableau", "Power BI"]
-
-            verdict_color = {"High": "green", "Medium": "orange", "Low": "red"}.get(verdict, text_color)
-
-            # ✅ Save result to DB using db_utils
-            save_result(
-                resume_file.name,
-                jd_file.name,
-                "Sample Role",
-                score,
-                verdict,
-                missing_skills,
-                location="Hyderabad"
-            )
+        jd_hash, jd_text = read_upload(jd_file)
+        jd_roles = {jd_file.name: parse_jd_text(jd_text)}
+        uploads = {resume_file.name: read_upload(resume_file) for resume_file in resume_files}
 
-            # Mark if score > 65
-            if score > 65:
-                high_score_exists = True
-
-            # Results Card
-            st.markdown(
-                f"""
-                <div style="background-color:{card_color}; padding:20px; border-radius:15px;
-                            box-shadow:2px 2px 10px {shadow_color}; margin-top:20px; color:{text_color};">
-                    <h4 style="color:#2E86C1;"><b>🎯 Analysis Results</b></h4>
-                    <b>Resume:</b> {resume_file.name}<br>
-                    <b>Job Description:</b> {jd_file.name}<br>
-                    <b>Role:</b> Sample Role<br>
-                    <b>Score:</b> {score:.2f}%<br>
-                    <b>Verdict:</b> <span style="color:{verdict_color};"><b>{verdict}</b></span><br>
-                    <b>Missing Skills:</b> {", ".join(missing_skills) if missing_skills else "None"}<br>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        # Pairs scored before (same resume and role content) come from the score
+        # manifest; only new uploads are parsed, embedded and scored
+        load_model()
+        with st.spinner("Scoring resumes..."):
+            manifest = ScoreManifest(SCORER_VERSION, UPLOAD_MANIFEST_FILE)
+            try:
+                results, rescored = match_with_manifest({name: text for name, (_, text) in uploads.items()}, jd_roles,
+                                                        manifest)
+            finally:
+                manifest.close()
+        st.caption(f"Scored {len(rescored)} new resume(s); {len(uploads) - len(rescored)} reused from earlier runs.")
 
-            # Summary Box
-            st.markdown(
-                f"""
-                <div style="background-color:{card_color}; padding:20px; border-radius:12px;
-                            margin-top:20px; border-left:6px solid #4CAF50; color:{text_color};">
-                    <h4 style="color:#27AE60;">📝 <b>Summary & Suggestions</b></h4>
-                    ✅ Your resume matches well with the JD.<br>
-                    📊 Overall Relevance Score: <b>{score:.2f}%</b> → 
-                    <span style="color:{verdict_color};"><b>{verdict} Fit</b></span><br>
-                    ⚡ Focus on improving by adding these skills: 
-                    <b>{", ".join(missing_skills) if missing_skills else "No major gaps detected"}</b><br>
-                    🚀 Next Step: Strengthen your profile with projects/certifications in these areas.
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        saved = st.session_state.setdefault("saved_results", set())
+        for resume_name, matches in results.items():
+            for match in matches:
+                score = float(match["score"])
+                verdict = match["verdict"]
+                missing_skills = match["missing_skills"]
+                role_title = match["role_title"]
+
+                verdict_color = {"High": "green", "Medium": "orange", "Low": "red"}.get(verdict, text_color)
+
+                # ✅ Save result to DB using db_utils (once per resume/JD/role content in this session)
+                save_key = (uploads[resume_name][0], jd_hash, role_title, job_location)
+                if save_key not in saved:
+                    save_result(
+                        resume_name,
+                        jd_file.name,
+                        role_title,
+                        score,
+                        verdict,
+                        missing_skills,
+                        location=job_location
+                    )
+                    saved.add(save_key)
+
+                # Mark if score > 65
+                if score > 65:
+                    high_score_exists = True
+
+                # Results Card
+                st.markdown(
+                    f"""
+                    <div style="background-color:{card_color}; padding:20px; border-radius:15px;
+                                box-shadow:2px 2px 10px {shadow_color}; margin-top:20px; color:{text_color};">
+                        <h4 style="color:#2E86C1;"><b>🎯 Analysis Results</b></h4>
+                        <b>Resume:</b> {resume_name}<br>
+                        <b>Job Description:</b> {jd_file.name}<br>
+                        <b>Role:</b> {role_title}<br>
+                        <b>Score:</b> {score:.2f}%<br>
+                        <b>Verdict:</b> <span style="color:{verdict_color};"><b>{verdict}</b></span><br>
+                        <b>Missing Skills:</b> {", ".join(missing_skills) if missing_skills else "None"}<br>
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+                # Summary Box
+                fit_message = {
+                    "High": "✅ Your resume matches well with the JD.",
+                    "Medium": "🟠 Your resume partially matches the JD.",
+                }.get(verdict, "🔴 Your resume is a weak match for the JD.")
+                st.markdown(
+                    f"""
+                    <div style="background-color:{card_color}; padding:20px; border-radius:12px;
+                                margin-top:20px; border-left:6px solid #4CAF50; color:{text_color};">
+                        <h4 style="color:#27AE60;">📝 <b>Summary & Suggestions</b></h4>
+                        {fit_message}<br>
+                        📊 Overall Relevance Score: <b>{score:.2f}%</b> → 
+                        <span style="color:{verdict_color};"><b>{verdict} Fit</b></span><br>
+                        ⚡ Focus on improving by adding these skills: 
+                        <b>{", ".join(missing_skills) if missing_skills else "No major gaps detected"}</b><br>
+                        🚀 Next Step: Strengthen your profile with projects/certifications in these areas.
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
 
         # 🎉 Trigger balloons only once, after all resumes are analyzed
         if high_score_exists:
@@ -183,43 +290,98 @@ if analyze_btn:
     else:
         st.error("⚠️ Please upload both a JD and at least one Resume before analyzing.")
 
+# ==============================
+# BACKGROUND JOBS (progress survives refresh via ?job=<id>)
+# ==============================
+def render_job(job_id):
+    job = get_job_runner().store.get_job(job_id)
+    if job is None:
+        st.warning("⚠️ This analysis job no longer exists.")
+        return
+    active = job["status"] in ("queued", "running")
+    st.subheader(f"🕒 Background Analysis - {job['jd_name']}")
+    st.progress(job["completed"] / job["total"] if job["total"] else 1.0,
+                text=f"{job['status'].title()}: {job['completed']} of {job['total']} resumes analyzed")
+
+    job_rows, _ = get_job_runner().store.job_results(job_id)
+    if job_rows:
+        df_job = pd.DataFrame(job_rows)
+        df_job["missing_skills"] = df_job["missing_skills"].apply(", ".join)
+        st.dataframe(df_job, use_container_width=True)
+    for resume_name, error in get_job_runner().store.item_errors(job_id):
+        st.warning(f"⚠️ Could not analyze {resume_name}: {error}")
+    if job["status"] == "failed":
+        st.error(f"❌ Job failed: {job['error']}")
+    elif not active:
+        st.success("✅ Background analysis finished.")
+
+    # New results landed: rerun the whole page so the dashboard below picks them up
+    seen_key = f"job_seen_{job_id}"
+    if st.session_state.get(seen_key) not in (None, job["completed"]):
+        st.session_state[seen_key] = job["completed"]
+        st.rerun()
+    st.session_state[seen_key] = job["completed"]
+
+if "job" in st.query_params:
+    st.divider()
+    tracked_job = get_job_runner().store.get_job(st.query_params["job"])
+    if tracked_job and tracked_job["status"] in ("queued", "running"):
+        if hasattr(st, "fragment"):
+            # Only this block re-runs while polling
+            st.fragment(run_every=JOB_POLL_SECONDS)(render_job)(st.query_params["job"])
+        else:
+            render_job(st.query_params["job"])
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+    else:
+        render_job(st.query_params["job"])
+    if st.button("✖️ Stop Tracking This Job"):
+        del st.query_params["job"]
+        st.rerun()
+
 # ==============================
 # DASHBOARD SECTION (Table View)
 # ==============================
 st.divider()
 st.subheader("📊 Dashboard - Search & Filter Results")
 
-# Fetch all results from DB
-all_results = fetch_results({})
-df_all = pd.DataFrame(all_results, columns=[
-    "ID", "Resume", "JD", "Role", "Score", "Verdict", "Missing Skills", "Location"
-]) if all_results else pd.DataFrame()
-
-# Dropdown filters
-roles = df_all['Role'].unique().tolist() if not df_all.empty else []
-locations = df_all['Location'].unique().tolist() if not df_all.empty else []
+# Filter choices come straight from the indexed columns
+roles = distinct_values("role_title")
+locations = distinct_values("location")
 
 role_filter = st.selectbox("🔎 Filter by Role Title", ["All"] + roles)
 location_filter = st.selectbox("📍 Filter by Location", ["All"] + locations)
 min_score, max_score = st.slider("📈 Score Range", 0, 100, (0, 100))
+page_size = st.selectbox("📄 Rows per page", [25, 50, 100, 250], index=1)
 
-# Apply filters
-df_filtered = df_all.copy()
-if role_filter != "All":
-    df_filtered = df_filtered[df_filtered["Role"] == role_filter]
-if location_filter != "All":
-    df_filtered = df_filtered[df_filtered["Location"] == location_filter]
-df_filtered = df_filtered[(df_filtered["Score"] >= min_score) & (df_filtered["Score"] <= max_score)]
+# Filters are applied in SQL, never in pandas
+filters = {
+    "role_title": role_filter if role_filter != "All" else None,
+    "location": location_filter if location_filter != "All" else None,
+    "min_score": min_score,
+    "max_score": max_score,
+}
 
-# Dashboard metrics
+# Dashboard metrics (SQL aggregates)
+summary = summarize_results(**filters)
 col1, col2, col3 = st.columns(3)
-col1.metric("📝 Total Resumes", len(df_filtered))
-col2.metric("📊 Average Score", f"{df_filtered['Score'].mean():.2f}%" if not df_filtered.empty else "0%")
-high_count = df_filtered[df_filtered["Verdict"] == "High"].shape[0] if not df_filtered.empty else 0
-col3.metric("🎯 High Matches", high_count)
+col1.metric("📝 Total Resumes", summary["total"])
+col2.metric("📊 Average Score", f"{summary['average_score']:.2f}%" if summary["total"] else "0%")
+col3.metric("🎯 High Matches", summary["high_matches"])
+
+# Keyset pagination: page_cursors[i] is the cursor that starts page i
+filter_key = (role_filter, location_filter, min_score, max_score, page_size)
+if st.session_state.get("filter_key") != filter_key:
+    st.session_state.filter_key = filter_key
+    st.session_state.page_cursors = [None]
+page_cursors = st.session_state.page_cursors
+
+page_rows, next_cursor = query_results(after=page_cursors[-1], limit=page_size, **filters)
+RESULT_COLUMNS = ["ID", "Resume", "JD", "Role", "Score", "Verdict", "Missing Skills", "Location"]
+df_page = pd.DataFrame(page_rows, columns=RESULT_COLUMNS)
 
 # Show results in table with color-coded verdict
-if not df_filtered.empty:
+if not df_page.empty:
     def color_verdict(val):
         if val == "High":
             return 'color: green; font-weight:bold'
@@ -230,16 +392,29 @@ if not df_filtered.empty:
         else:
             return ''
 
-    st.dataframe(df_filtered.style.applymap(color_verdict, subset=["Verdict"]), use_container_width=True)
+    st.dataframe(df_page.style.applymap(color_verdict, subset=["Verdict"]), use_container_width=True)
 
-    # Download filtered results
-    csv = df_filtered.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        label="📥 Download Filtered Results as CSV",
-        data=csv,
-        file_name="filtered_resume_results.csv",
-        mime="text/csv",
-        use_container_width=True,
-    )
+    # Page navigation
+    page_count = max(1, -(-summary["total"] // page_size))
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("⬅️ Previous", disabled=len(page_cursors) == 1, use_container_width=True):
+        page_cursors.pop()
+        st.rerun()
+    info_col.markdown(f"<div style='text-align:center;'>Page {len(page_cursors)} of {page_count}</div>",
+                      unsafe_allow_html=True)
+    if next_col.button("Next ➡️", disabled=next_cursor is None, use_container_width=True):
+        page_cursors.append(next_cursor)
+        st.rerun()
+
+    # Download filtered results (built only on request, streamed page by page from SQL)
+    if st.button("📦 Prepare CSV of Filtered Results", use_container_width=True):
+        csv = pd.DataFrame(iter_results(**filters), columns=RESULT_COLUMNS).to_csv(index=False).encode("utf-8")
+        st.download_button(
+            label="📥 Download Filtered Results as CSV",
+            data=csv,
+            file_name="filtered_resume_results.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
 else:
     st.info("ℹ️ No results match the selected filters.")
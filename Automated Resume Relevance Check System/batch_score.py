@@ -0,0 +1,353 @@
+# batch_score.py
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from parse_files import extract_documents
+from parse_jds import parse_jd_text
+from integrated_pipeline import score_batch, embed_role_skills, flatten_roles, match_entry
+import db_utils
+import resources
+from embedding_backend import set_threads
+from memory_budget import MemoryBudget, MemoryTracker, parse_memory_size
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+JD_EXTENSIONS = (".pdf", ".docx", ".txt")
+CSV_FIELDS = ["resume_file", "jd_file", "role_title", "score", "verdict", "missing_skills"]
+
+# -----------------------------
+# Inputs
+# -----------------------------
+def resolve_inputs(patterns, extensions):
+    """Sorted, de-duplicated files from directories, glob patterns (** allowed) or file paths."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = (os.path.join(pattern, f) for f in os.listdir(pattern))
+        else:
+            candidates = glob.glob(pattern, recursive=True)
+        files.update(f for f in candidates if f.lower().endswith(extensions) and os.path.isfile(f))
+    return sorted(files)
+
+def load_roles(jd_files):
+    """[(jd_file name, role)] for every role in the given JD files (a few files, read in-process)."""
+    jd_roles = {}
+    for path, text, error in extract_documents(jd_files):
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        jd_roles[os.path.basename(path)] = parse_jd_text(text)
+    return flatten_roles(jd_roles)
+
+def read_checkpoint(path):
+    """Resume files already written by an earlier run."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+# -----------------------------
+# Scoring (runs in worker processes)
+# -----------------------------
+_worker_state = {}
+
+def _init_worker(flat_roles, batch_size, threads, track_memory=False, tracker=None):
+    # Several processes each running a multi-threaded encoder oversubscribe the CPU
+    if threads:
+        set_threads(threads)
+        resources.EMBEDDING_THREADS = threads  # picked up when the worker loads the model
+    if track_memory and tracker is None:
+        tracker = MemoryTracker().start()
+    _worker_state.update(flat_roles=flat_roles, batch_size=batch_size, role_embeddings=None, tracker=tracker)
+
+def score_files(resume_files, batch_size=None):
+    """Extract and score one chunk of resumes against the worker's roles.
+
+    Returns (resume_files, records, errors, memory) where errors is
+    [(file, message)]; unreadable resumes produce no records. memory is None
+    unless the worker tracks memory, then {stage: StageMemory} for this chunk.
+    """
+    flat_roles = _worker_state["flat_roles"]
+    roles = [role for _, role in flat_roles]
+    batch_size = batch_size or _worker_state["batch_size"]
+    tracker = _worker_state["tracker"]
+    stage = tracker.stage if tracker is not None else (lambda name: nullcontext())
+    if _worker_state["role_embeddings"] is None:
+        # Embedded once per process and reused for every chunk
+        _worker_state["role_embeddings"] = embed_role_skills([role.get("skills", []) for role in roles], batch_size)
+
+    with stage("chunk") as chunk_memory:
+        with stage("extract") as extract_memory:
+            documents = extract_documents(resume_files)
+        errors = [(f, error) for f, _, error in documents if error]
+        readable = [(f, text) for f, text, error in documents if not error]
+        with stage("score") as score_memory:
+            rows = score_batch([text for _, text in readable], roles, batch_size, _worker_state["role_embeddings"])
+
+        records = []
+        for (resume_file, _), row in zip(readable, rows):
+            for (jd_file, role), scored in zip(flat_roles, row):
+                records.append({"resume_file": resume_file, **match_entry(jd_file, role, scored)})
+    memory = None
+    if tracker is not None:
+        memory = {"chunk": chunk_memory, "extract": extract_memory, "score": score_memory}
+    return resume_files, records, errors, memory
+
+def iter_scored_chunks(resume_files, flat_roles, processes=1, chunk_size=256, batch_size=256, budget=None):
+    """Yield score_files results chunk by chunk, in completion order when processes > 1.
+
+    At most two chunks per process are in flight, so memory stays bounded
+    however many resumes there are. With a started MemoryBudget, each chunk's
+    size and encoder batch size come from the budget, which is fed the
+    chunk's RSS peak (per worker process when processes > 1).
+    """
+    def next_chunks():
+        start = 0
+        while start < len(resume_files):
+            size, batch = budget.sizes() if budget is not None else (chunk_size, batch_size)
+            yield resume_files[start:start + size], batch
+            start += size
+
+    def observe(result):
+        memory = result[3]
+        if budget is not None and memory is not None:
+            budget.observe(len(result[0]), memory["chunk"].rss_peak, memory["chunk"].rss_start)
+
+    if processes <= 1:
+        _init_worker(flat_roles, batch_size, None, tracker=budget.tracker if budget is not None else None)
+        for chunk, batch in next_chunks():
+            result = score_files(chunk, batch)
+            observe(result)
+            yield result
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // processes)
+    with ProcessPoolExecutor(processes, initializer=_init_worker,
+                             initargs=(flat_roles, batch_size, threads, budget is not None)) as pool:
+        pending = set()
+
+        def finished(done):
+            for future in done:
+                result = future.result()
+                observe(result)
+                if result[3] is not None:
+                    budget.tracker.merge(result[3])
+                yield result
+
+        for chunk, batch in next_chunks():
+            pending.add(pool.submit(score_files, chunk, batch))
+            if len(pending) >= 2 * processes:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+
+# -----------------------------
+# Outputs
+# -----------------------------
+class JsonlWriter:
+    def __init__(self, path, append):
+        self.file = open(path, "a" if append else "w", encoding="utf-8")
+
+    @staticmethod
+    def discard_unfinished(path, finished):
+        """Drop records of resumes not in finished: a chunk written but not checkpointed before a crash.
+
+        Returns the number of records dropped.
+        """
+        if not os.path.exists(path):
+            return 0
+        dropped = 0
+        with open(path, "r", encoding="utf-8") as src, open(f"{path}.tmp", "w", encoding="utf-8") as dst:
+            for line in src:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    dropped += 1  # cut off mid-line
+                    continue
+                if record.get("resume_file") in finished:
+                    dst.write(line if line.endswith("\n") else line + "\n")
+                else:
+                    dropped += 1
+        os.replace(f"{path}.tmp", path)
+        return dropped
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, default=float) + "\n")  # scores may be numpy floats
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class CsvWriter(JsonlWriter):
+    def __init__(self, path, append):
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path))
+        self.file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+        if write_header:
+            self.writer.writeheader()
+
+    @staticmethod
+    def discard_unfinished(path, finished):
+        """CSV form of JsonlWriter.discard_unfinished."""
+        if not os.path.exists(path):
+            return 0
+        dropped = 0
+        with open(path, "r", encoding="utf-8", newline="") as src, \
+                open(f"{path}.tmp", "w", encoding="utf-8", newline="") as dst:
+            writer = csv.DictWriter(dst, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for row in csv.DictReader(src):
+                # A row cut off mid-write has missing fields
+                if row.get("resume_file") in finished and None not in row.values():
+                    writer.writerow(row)
+                else:
+                    dropped += 1
+        os.replace(f"{path}.tmp", path)
+        return dropped
+
+    def write(self, records):
+        self.writer.writerows(
+            {**record, "score": float(record["score"]), "missing_skills": ", ".join(record["missing_skills"])}
+            for record in records
+        )
+
+class DbWriter:
+    """Writes into the results table through db_utils (one transaction per chunk).
+
+    Rows are keyed by resume, JD file and role position, so a chunk scored
+    again (after a crash, or in a later run) replaces its earlier rows.
+    """
+
+    def __init__(self, path, append):
+        db_utils.DB_FILE = path
+        db_utils.init_db()
+
+    @staticmethod
+    def discard_unfinished(path, finished):
+        return 0  # rescored rows replace their earlier copies by key
+
+    def write(self, records):
+        # A resume's records are all in one chunk, in role order
+        positions = {}
+        keyed = []
+        for record in records:
+            pair = (record["resume_file"], record["jd_file"])
+            positions[pair] = positions.get(pair, -1) + 1
+            keyed.append({**record, "source_key": f"batch:{pair[0]}:{pair[1]}:{positions[pair]}"})
+        db_utils.save_results_many(keyed, replace=True)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "db": DbWriter}
+
+# -----------------------------
+# Progress
+# -----------------------------
+class Progress:
+    """Throughput line on stderr, refreshed after every chunk."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.pairs = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+
+    def update(self, resumes, pairs, failed):
+        self.done += resumes
+        self.pairs += pairs
+        self.failed += failed
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        sys.stderr.write(
+            f"\r{self.done}/{self.total} resumes | {rate:.1f} resumes/s | "
+            f"{self.pairs / elapsed if elapsed else 0.0:.0f} pairs/s | {self.failed} failed | ETA {eta:.0f}s   "
+        )
+        sys.stderr.flush()
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score many resumes against many JDs in bulk")
+    parser.add_argument("--resumes", nargs="+", required=True, help="resume directories or glob patterns")
+    parser.add_argument("--jds", nargs="+", required=True, help="JD directories, glob patterns or files")
+    parser.add_argument("--output", required=True, help="output file (JSONL, CSV or SQLite database)")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="output format (default: from --output extension)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=256, help="resumes per work unit")
+    parser.add_argument("--batch-size", type=int, default=256, help="encoder batch size")
+    parser.add_argument("--checkpoint", help="file listing finished resumes (default: OUTPUT.checkpoint)")
+    parser.add_argument("--resume-from", metavar="CHECKPOINT",
+                        help="skip resumes listed in this checkpoint and append to the output")
+    parser.add_argument("--max-memory", help="memory budget such as 4G; chunk and batch sizes adapt to it")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or {".csv": "csv", ".db": "db", ".sqlite": "db"}.get(
+        os.path.splitext(args.output)[1].lower(), "jsonl"
+    )
+    checkpoint_path = args.resume_from or args.checkpoint or f"{args.output}.checkpoint"
+    finished = read_checkpoint(args.resume_from) if args.resume_from else set()
+
+    jd_files = resolve_inputs(args.jds, JD_EXTENSIONS)
+    flat_roles = load_roles(jd_files)
+    resume_files = [f for f in resolve_inputs(args.resumes, RESUME_EXTENSIONS) if f not in finished]
+    print(f"{len(jd_files)} JD file(s), {len(flat_roles)} role(s), {len(resume_files)} resume(s) to score"
+          + (f" ({len(finished)} already done)" if finished else ""))
+    if not flat_roles or not resume_files:
+        return 0
+
+    budget = None
+    if args.max_memory:
+        # Worker processes share the budget; the parent only holds in-flight results
+        budget = MemoryBudget(parse_memory_size(args.max_memory) // max(1, args.processes),
+                              args.chunk_size, args.batch_size).start()
+
+    if args.resume_from:
+        dropped = WRITERS[output_format].discard_unfinished(args.output, finished)
+        if dropped:
+            print(f"Discarded {dropped} record(s) of an unfinished chunk from {args.output}")
+    writer = WRITERS[output_format](args.output, append=bool(args.resume_from))
+    progress = Progress(len(resume_files))
+    with open(checkpoint_path, "a" if args.resume_from else "w", encoding="utf-8") as checkpoint:
+        try:
+            for chunk, records, errors, _ in iter_scored_chunks(resume_files, flat_roles, args.processes,
+                                                                args.chunk_size, args.batch_size, budget):
+                for resume_file, error in errors:
+                    sys.stderr.write(f"\nError reading {resume_file}: {error}\n")
+                # Output is durable before the chunk is checkpointed; a crash repeats at most this
+                # chunk, and --resume-from first discards (or, for a database, replaces) its output
+                writer.write(records)
+                writer.flush()
+                checkpoint.write("".join(f"{f}\n" for f in chunk))
+                checkpoint.flush()
+                progress.update(len(chunk), len(records), len(errors))
+        finally:
+            writer.close()
+            if budget is not None:
+                budget.stop()
+    sys.stderr.write("\n")
+    print(f"Wrote {progress.pairs} result(s) for {progress.done - progress.failed} resume(s) to {args.output}"
+          f" in {time.perf_counter() - progress.start:.1f}s; checkpoint: {checkpoint_path}")
+    if budget is not None:
+        print(budget.report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
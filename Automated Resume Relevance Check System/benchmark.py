@@ -0,0 +1,175 @@
+# benchmark.py
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from synthetic_corpus import generate_corpus
+from parse_files import extract_pdf_text, extract_docx_text, extract_file_text, get_all_resumes
+from parse_jds import parse_jd_file
+from integrated_pipeline import (
+    get_model, compute_hard_match, semantic_similarity_jd_resume, semantic_score_matrix, score_batch, flatten_roles
+)
+from embedding_cache import EmbeddingCache
+import db_utils
+import document_cache
+
+BASELINE_FILE = "benchmark_baselines.json"  # saved stage timings, keyed by corpus size
+CORPUS_DIR = "bench_corpus"                 # generated corpora, reused across runs
+TOLERANCE = 0.20                            # slowdown over baseline reported as a regression
+PAIR_SAMPLE = 200                           # pairs timed with the per-pair semantic function
+
+# -----------------------------
+# Timing
+# -----------------------------
+class StageTimer:
+    """Records wall time and item count per benchmark stage."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, items, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        self.stages[name] = {"seconds": round(seconds, 4), "items": items,
+                             "per_second": round(items / seconds, 1) if seconds else None}
+        print(f"  {name:<28} {seconds:9.3f}s  {items:>9} items  "
+              f"{self.stages[name]['per_second'] or 0:>10.1f}/s")
+        return result
+
+def cold_embeddings(root):
+    """Point the shared encoder at an empty embedding cache under root (loading the model if needed).
+
+    The default cache persists across runs and stages, so without this the
+    scoring stages would time SQLite lookups instead of inference.
+    """
+    model = get_model()
+    path = os.path.join(root, "bench_embedding_cache.db")
+    model.cache.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    model.cache = EmbeddingCache(model.model_name, path=path)
+
+# -----------------------------
+# Stages
+# -----------------------------
+def run_benchmark(n_resumes, n_jds=10, corpus_dir=CORPUS_DIR, pair_sample=PAIR_SAMPLE, seed=0):
+    """Time every pipeline stage on a synthetic corpus of n_resumes; returns {stage: timing}."""
+    timer = StageTimer()
+    root = os.path.join(corpus_dir, f"{n_resumes}x{n_jds}")
+    resume_dir, jd_dir = os.path.join(root, "resumes"), os.path.join(root, "JDS")
+    if not os.path.isdir(resume_dir):
+        timer.run("generate_corpus", n_resumes + n_jds, generate_corpus, root, n_resumes, n_jds, seed=seed)
+
+    resume_files = get_all_resumes(resume_dir)
+    pdf_files = [f for f in resume_files if f.endswith(".pdf")]
+    docx_files = [f for f in resume_files if f.endswith(".docx")]
+    jd_files = sorted(os.path.join(jd_dir, f) for f in os.listdir(jd_dir))
+
+    # Parsing: cold against an empty document cache, then warm from it
+    document_cache.CACHE_DIR = os.path.join(root, ".document_cache")
+    shutil.rmtree(document_cache.CACHE_DIR, ignore_errors=True)
+    document_cache._hash_memo.clear()
+    pdf_texts = timer.run("extract_pdf_text", len(pdf_files), lambda: [extract_pdf_text(f) for f in pdf_files])
+    docx_texts = timer.run("extract_docx_text", len(docx_files), lambda: [extract_docx_text(f) for f in docx_files])
+    document_cache._hash_memo.clear()
+    timer.run("extract_cached", len(resume_files), lambda: [extract_file_text(f) for f in resume_files])
+    jd_roles = timer.run("parse_jd_file", len(jd_files),
+                         lambda: {os.path.basename(f): parse_jd_file(f) for f in jd_files})
+    resume_texts = pdf_texts + docx_texts
+    flat_roles = flatten_roles(jd_roles)
+    roles = [role for _, role in flat_roles]
+    roles_skills = [role["skills"] for role in roles]
+    n_pairs = len(resume_texts) * len(roles)
+
+    # Scoring
+    timer.run("hard_match", n_pairs,
+              lambda: [compute_hard_match(text, skills) for text in resume_texts for skills in roles_skills])
+    rng = random.Random(seed)
+    sample = [(rng.choice(resume_texts), rng.choice(roles_skills)) for _ in range(min(pair_sample, n_pairs))]
+    # Every embedding stage starts cold, so each one times inference
+    cold_embeddings(root)
+    timer.run("semantic_per_pair", len(sample),
+              lambda: [semantic_similarity_jd_resume(skills, text) for text, skills in sample])
+    cold_embeddings(root)
+    timer.run("semantic_batched", n_pairs, semantic_score_matrix, resume_texts, roles_skills)
+    cold_embeddings(root)
+    rows = timer.run("weighted_scoring", n_pairs, score_batch, resume_texts, roles)
+
+    # Database
+    records = [
+        {"resume_file": f, "jd_file": jd_file, "role_title": role["role_title"], **scored}
+        for f, row in zip(pdf_files + docx_files, rows) for (jd_file, role), scored in zip(flat_roles, row)
+    ]
+    db_utils.DB_FILE = os.path.join(root, "bench_results.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_utils.DB_FILE + suffix):
+            os.remove(db_utils.DB_FILE + suffix)
+    db_utils.init_db()
+    timer.run("db_write", len(records), db_utils.save_results_many, records)
+    timer.run("db_read_pages", len(records), lambda: sum(1 for _ in db_utils.iter_results(page_size=1000)))
+    timer.run("db_summary", 1, db_utils.summarize_results, min_score=40)
+    return timer.stages
+
+# -----------------------------
+# Baselines
+# -----------------------------
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baselines(baselines, path=BASELINE_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+def compare(stages, baseline, tolerance=TOLERANCE):
+    """[(stage, baseline seconds, seconds, ratio)] for stages slower than baseline by more than tolerance."""
+    regressions = []
+    for name, timing in stages.items():
+        before = baseline.get(name)
+        # Very short stages are dominated by noise
+        if not before or name == "generate_corpus" or before["seconds"] < 0.05:
+            continue
+        ratio = timing["seconds"] / before["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append((name, before["seconds"], timing["seconds"], ratio))
+    return regressions
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic corpora")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000], help="corpus sizes (resumes)")
+    parser.add_argument("--jds", type=int, default=10, help="JD files per corpus")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR)
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--pair-sample", type=int, default=PAIR_SAMPLE)
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baseline_file)
+    regressed = False
+    for n_resumes in args.scales:
+        print(f"\n===== {n_resumes} resumes x {args.jds} JDs =====")
+        stages = run_benchmark(n_resumes, args.jds, args.corpus_dir, args.pair_sample)
+        key = f"{n_resumes}x{args.jds}"
+        for name, before, after, ratio in compare(stages, baselines.get(key, {}), args.tolerance):
+            regressed = True
+            print(f"  REGRESSION {name}: {before:.3f}s -> {after:.3f}s ({ratio:.2f}x)")
+        if args.save_baseline:
+            baselines[key] = stages
+    if args.save_baseline:
+        save_baselines(baselines, args.baseline_file)
+        print(f"\nBaselines saved to {args.baseline_file}")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
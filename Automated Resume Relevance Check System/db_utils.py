@@ -1,13 +1,101 @@
 # db_utils.py
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+import instrumentation
 
 DB_FILE = "results.db"  # SQLite database file
 
-# Initialize the database and create table if it doesn't exist
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
+# Connection pragmas. WAL lets readers run alongside a writer; batch jobs can
+# trade durability for speed with configure(synchronous="OFF", ...).
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # negative = KiB, i.e. 64 MB page cache
+    "busy_timeout": 30000,
+    "foreign_keys": "ON",
+}
+POOL_SIZE = 8
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections with PRAGMAS applied.
+
+    Each connection is lent to one thread at a time through connection().
+    """
+
+    def __init__(self, db_file, size=POOL_SIZE, pragmas=None):
+        self.db_file = db_file
+        self.size = size
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        """Close idle connections; connections still in use are closed by their garbage collection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """The shared pool for DB_FILE (recreated if DB_FILE was changed)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_file != DB_FILE:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_FILE, POOL_SIZE)
+        return _pool
+
+def configure(pool_size=None, **pragmas):
+    """Tune connection pragmas (e.g. synchronous="OFF", cache_size=-200000) and pool size.
+
+    Applies to connections opened afterwards; idle pooled connections are dropped.
+    """
+    global _pool, POOL_SIZE
+    PRAGMAS.update(pragmas)
+    if pool_size is not None:
+        POOL_SIZE = pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+# -----------------------------
+# Schema migrations
+# -----------------------------
+# Each entry upgrades the schema by one version (tracked in PRAGMA user_version)
+def _migrate_v1(conn):
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS results (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         resume_file TEXT,
@@ -19,25 +107,129 @@ def init_db():
         location TEXT
     )
     """)
-    conn.commit()
-    conn.close()
+
+def _migrate_v2(conn):
+    # Indexes for filtering and score ordering, and one row per missing skill
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_role_score ON results (role_title, score, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_location_score ON results (location, score, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_score ON results (score, id)")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS result_missing_skills (
+        skill TEXT,
+        result_id INTEGER REFERENCES results (id) ON DELETE CASCADE,
+        PRIMARY KEY (skill, result_id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_missing_skills_result ON result_missing_skills (result_id)")
+    # Backfill from the comma-joined column
+    rows = conn.execute("SELECT id, missing_skills FROM results WHERE missing_skills != ''").fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO result_missing_skills (skill, result_id) VALUES (?, ?)",
+        [(skill.strip(), result_id) for result_id, joined in rows for skill in joined.split(",") if skill.strip()]
+    )
+
+def _migrate_v3(conn):
+    # Rows written by a retryable producer (e.g. a background job) carry a key;
+    # saving the same key again is a no-op, so a retried chunk adds no duplicates
+    conn.execute("ALTER TABLE results ADD COLUMN source_key TEXT")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_results_source_key ON results (source_key) WHERE source_key IS NOT NULL"
+    )
+
+MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Initialize the database and bring the schema up to date
+def init_db():
+    with get_pool().connection() as conn:
+        with conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, migrate in enumerate(MIGRATIONS[version:], start=version + 1):
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+
+# -----------------------------
+# Writes
+# -----------------------------
+# Columns returned by the read functions, in this order
+RESULT_FIELDS = "id, resume_file, jd_file, role_title, score, verdict, missing_skills, location"
+
+def _result_row(resume_file, jd_file, role_title, score, verdict, missing_skills, location="Unknown",
+                source_key=None):
+    return (resume_file, jd_file, role_title, float(score), verdict, list(missing_skills), location, source_key)
 
 # Save a result row into the database
 def save_result(resume_file, jd_file, role_title, score, verdict, missing_skills, location="Unknown"):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-    INSERT INTO results (resume_file, jd_file, role_title, score, verdict, missing_skills, location)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (resume_file, jd_file, role_title, score, verdict, ", ".join(missing_skills), location))
-    conn.commit()
-    conn.close()
+    save_results_many([(resume_file, jd_file, role_title, score, verdict, missing_skills, location)])
+
+# Save many result rows in one transaction
+def save_results_many(rows, chunk_size=5000, replace=False):
+    """Insert result rows with executemany in a single transaction.
+
+    Each row is either a tuple in save_result argument order (location
+    optional) or a match record dict as produced by
+    integrated_pipeline.iter_matches (keys resume_file, jd_file, role_title,
+    score, verdict, missing_skills, optional location). rows may be a
+    generator; it is consumed chunk_size rows at a time. A row with a
+    source_key (optional last tuple item or dict key) is skipped if a row
+    with that key exists, or replaces that row if replace is True. Returns
+    the number of rows inserted.
+    """
+    def as_tuples():
+        for row in rows:
+            if isinstance(row, dict):
+                yield _result_row(
+                    row["resume_file"], row["jd_file"], row["role_title"], row["score"],
+                    row["verdict"], row["missing_skills"], row.get("location", "Unknown"), row.get("source_key")
+                )
+            else:
+                yield _result_row(*row)
+
+    inserted = 0
+    with instrumentation.timed("db_save") as timer, get_pool().connection() as conn:
+        with conn:  # one transaction, committed on success
+            chunk = []
+            for row in as_tuples():
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    inserted += _insert_chunk(conn, chunk, replace)
+                    chunk = []
+            if chunk:
+                inserted += _insert_chunk(conn, chunk, replace)
+        timer.items = inserted
+    return inserted
+
+_INSERT_RESULT = """
+INSERT OR IGNORE INTO results (resume_file, jd_file, role_title, score, verdict, missing_skills, location, source_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _insert_chunk(conn, chunk, replace=False):
+    plain = [r for r in chunk if r[7] is None]
+    keyed = [r for r in chunk if r[7] is not None]
+    skill_rows = []
+    if plain:
+        conn.executemany(_INSERT_RESULT, [(*r[:5], ", ".join(r[5]), r[6], None) for r in plain])
+        # AUTOINCREMENT ids are consecutive while this transaction holds the write lock
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        first_id = last_id - len(plain) + 1
+        skill_rows += [(skill, first_id + n) for n, r in enumerate(plain) for skill in r[5] if skill]
+    inserted = len(plain)
+    # Keyed rows may be skipped, so their ids are taken one insert at a time
+    if replace:
+        # Missing-skill rows go with the result rows (ON DELETE CASCADE)
+        conn.executemany("DELETE FROM results WHERE source_key = ?", [(r[7],) for r in keyed])
+    for r in keyed:
+        cursor = conn.execute(_INSERT_RESULT, (*r[:5], ", ".join(r[5]), r[6], r[7]))
+        if cursor.rowcount == 1:
+            inserted += 1
+            skill_rows += [(skill, cursor.lastrowid) for skill in r[5] if skill]
+    conn.executemany("INSERT OR IGNORE INTO result_missing_skills (skill, result_id) VALUES (?, ?)", skill_rows)
+    return inserted
 
 # Fetch results with optional filters
 def fetch_results(filters={}):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    query = "SELECT * FROM results WHERE 1=1"
+    query = f"SELECT {RESULT_FIELDS} FROM results WHERE 1=1"
     params = []
 
     # Apply filters
@@ -54,7 +246,85 @@ def fetch_results(filters={}):
         query += " AND location LIKE ?"
         params.append(f"%{filters['location']}%")
 
-    cursor.execute(query, tuple(params))
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    with get_pool().connection() as conn:
+        return conn.execute(query, tuple(params)).fetchall()
+
+# -----------------------------
+# Indexed queries
+# -----------------------------
+def _filter_clause(role_title=None, location=None, min_score=None, max_score=None, verdict=None,
+                   missing_skill=None):
+    clauses, params = [], []
+    if role_title:
+        clauses.append("role_title = ?")
+        params.append(role_title)
+    if location:
+        clauses.append("location = ?")
+        params.append(location)
+    if min_score is not None:
+        clauses.append("score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append("score <= ?")
+        params.append(max_score)
+    if verdict:
+        clauses.append("verdict = ?")
+        params.append(verdict)
+    if missing_skill:
+        clauses.append("id IN (SELECT result_id FROM result_missing_skills WHERE skill = ?)")
+        params.append(missing_skill)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def query_results(after=None, limit=50, **filters):
+    """One page of results, best score first, filtered and sorted in SQLite.
+
+    filters: role_title, location (exact match), min_score, max_score,
+    verdict, missing_skill. Pagination is keyset based: pass the returned
+    cursor as after= to get the next page. Returns (rows, cursor); cursor is
+    None on the last page.
+    """
+    where, params = _filter_clause(**filters)
+    if after is not None:
+        where += (" AND " if where else " WHERE ") + "(score, id) < (?, ?)"
+        params.extend(after)
+    query = f"SELECT {RESULT_FIELDS} FROM results{where} ORDER BY score DESC, id DESC LIMIT ?"
+    with get_pool().connection() as conn:
+        rows = conn.execute(query, (*params, limit)).fetchall()
+    cursor = (rows[-1][4], rows[-1][0]) if len(rows) == limit else None
+    return rows, cursor
+
+def iter_results(page_size=1000, **filters):
+    """Yield every matching row, one keyset page at a time."""
+    after = None
+    while True:
+        rows, after = query_results(after=after, limit=page_size, **filters)
+        yield from rows
+        if after is None:
+            break
+
+def candidates_missing_skill(skill, after=None, limit=50, **filters):
+    """Results whose role needs `skill` and whose resume lacks it (indexed lookup)."""
+    return query_results(after=after, limit=limit, missing_skill=skill, **filters)
+
+# -----------------------------
+# Aggregates
+# -----------------------------
+FILTER_COLUMNS = ("role_title", "location", "verdict")
+
+def distinct_values(column):
+    """Sorted distinct non-null values of a filter column (read from its index)."""
+    if column not in FILTER_COLUMNS:
+        raise ValueError(f"Unsupported filter column: {column}")
+    with get_pool().connection() as conn:
+        rows = conn.execute(
+            f"SELECT DISTINCT {column} FROM results WHERE {column} IS NOT NULL ORDER BY {column}"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+def summarize_results(**filters):
+    """Count, average score and number of High verdicts for the filtered results."""
+    where, params = _filter_clause(**filters)
+    query = f"SELECT COUNT(*), AVG(score), COALESCE(SUM(verdict = 'High'), 0) FROM results{where}"
+    with get_pool().connection() as conn:
+        total, average, high = conn.execute(query, params).fetchone()
+    return {"total": total, "average_score": average, "high_matches": high}
@@ -0,0 +1,130 @@
+# document_cache.py
+import hashlib
+import io
+import json
+import os
+import tempfile
+import fitz  # PyMuPDF
+import docx2txt
+from text_normalization import standardize_resume_text
+import instrumentation
+
+# Bump whenever extraction or standardization output changes; old entries are then ignored
+EXTRACTOR_VERSION = 1
+CACHE_DIR = ".document_cache"  # folder holding cached document text
+
+_hash_memo = {}  # (path, size, mtime) -> content hash, avoids re-hashing within a process
+
+# -----------------------------
+# Raw extraction (uncached)
+# -----------------------------
+def read_pages(file_path):
+    """Extract a document as a list of page texts, raising on failure.
+
+    PDFs give one entry per page; DOCX and TXT files give a single entry.
+    """
+    lower = file_path.lower()
+    if lower.endswith(".pdf"):
+        with fitz.open(file_path) as doc:
+            return [page.get_text() for page in doc]
+    elif lower.endswith(".docx"):
+        return [docx2txt.process(file_path)]
+    elif lower.endswith(".txt"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return [f.read()]
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+def read_pages_from_bytes(data, filename):
+    """read_pages for in-memory file content (e.g. an upload); the type comes from filename."""
+    lower = filename.lower()
+    if lower.endswith(".pdf"):
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return [page.get_text() for page in doc]
+    elif lower.endswith(".docx"):
+        return [docx2txt.process(io.BytesIO(data))]
+    elif lower.endswith(".txt"):
+        return [data.decode("utf-8")]
+    raise ValueError(f"Unsupported file type: {filename}")
+
+# -----------------------------
+# Content-addressed cache
+# -----------------------------
+def content_hash(file_path):
+    """sha256 of the file bytes."""
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+def _entry_path(file_path, cache_dir):
+    return _digest_entry_path(content_hash(file_path), file_path, cache_dir)
+
+def _digest_entry_path(digest, filename, cache_dir):
+    # The extension is part of the key: the same bytes parse differently as PDF and DOCX
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    cache_dir = cache_dir or CACHE_DIR  # read at call time so CACHE_DIR can be changed at runtime
+    return os.path.join(cache_dir, digest[:2], f"{digest}.{ext}.v{EXTRACTOR_VERSION}.json")
+
+def _load_entry(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _store_entry(path, entry):
+    # Write to a temp file and rename so parallel workers never see a partial entry
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+def get_pages(file_path, cache_dir=None):
+    """Page texts of a document, read from the cache when the same content was seen before."""
+    path = _entry_path(file_path, cache_dir)
+    entry = _load_entry(path)
+    instrumentation.count("document_cache.misses" if entry is None else "document_cache.hits")
+    if entry is None:
+        with instrumentation.timed("parse"):
+            entry = {"pages": read_pages(file_path)}
+        _store_entry(path, entry)
+    return entry["pages"]
+
+def get_pages_from_bytes(data, filename, cache_dir=None):
+    """get_pages for in-memory file content, sharing cache entries with files of the same bytes."""
+    path = _digest_entry_path(hashlib.sha256(data).hexdigest(), filename, cache_dir)
+    entry = _load_entry(path)
+    instrumentation.count("document_cache.misses" if entry is None else "document_cache.hits")
+    if entry is None:
+        with instrumentation.timed("parse"):
+            entry = {"pages": read_pages_from_bytes(data, filename)}
+        _store_entry(path, entry)
+    return entry["pages"]
+
+def get_raw_text(file_path, cache_dir=None):
+    """Full document text (pages concatenated), cached by content hash."""
+    return "".join(get_pages(file_path, cache_dir))
+
+def get_raw_text_from_bytes(data, filename, cache_dir=None):
+    """get_raw_text for in-memory file content."""
+    return "".join(get_pages_from_bytes(data, filename, cache_dir))
+
+def get_standardized_text(file_path, cache_dir=None):
+    """standardize_resume_text output for a document, cached alongside its raw text."""
+    path = _entry_path(file_path, cache_dir)
+    entry = _load_entry(path)
+    instrumentation.count("document_cache.misses" if entry is None else "document_cache.hits")
+    if entry is None:
+        with instrumentation.timed("parse"):
+            entry = {"pages": read_pages(file_path)}
+    if "standardized" not in entry:
+        entry["standardized"] = standardize_resume_text("".join(entry["pages"]))
+        _store_entry(path, entry)
+    return entry["standardized"]
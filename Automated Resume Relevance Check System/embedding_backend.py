@@ -0,0 +1,203 @@
+# embedding_backend.py
+import argparse
+import random
+import sys
+import time
+import numpy as np
+import instrumentation
+
+# torch: the PyTorch model. onnx: its ONNX export run by ONNX Runtime on CPU.
+# onnx-int8: the int8-quantized ONNX export published with all-MiniLM-L6-v2.
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"  # AVX2 kernels run on any recent x86 CPU
+MAX_BATCH = 512                                 # cap for batches of very short inputs (skills)
+DEFAULT_MAX_SEQ_LENGTH = 256
+TOLERANCE = 1e-3                                # max allowed 1 - cosine against SentenceTransformer.encode
+
+# encode() options that leave the output a plain array in input order
+_BUCKETED_KWARGS = {"show_progress_bar", "normalize_embeddings"}
+
+def model_id(model_name, backend):
+    """Name cached embeddings and score manifests are keyed by.
+
+    torch and fp32 ONNX agree to float rounding and share one id; int8
+    vectors differ measurably and get their own.
+    """
+    return f"{model_name}:{backend}" if backend == "onnx-int8" else model_name
+
+def set_threads(threads):
+    """Limit PyTorch intra-op threads (ONNX Runtime sessions get theirs when loaded)."""
+    if not threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+# -----------------------------
+# Loading
+# -----------------------------
+def load_sentence_transformer(model_name, backend="torch", threads=None, **model_kwargs):
+    """(SentenceTransformer, backend actually used) for one of BACKENDS.
+
+    The ONNX backends need onnxruntime and optimum. Without them, onnx
+    falls back to torch with a warning (both share one model_id), but
+    onnx-int8 raises ImportError: its vectors are keyed differently, and a
+    silent fallback would label torch scores as int8 in score manifests.
+    """
+    from sentence_transformers import SentenceTransformer
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {BACKENDS}")
+    set_threads(threads)
+    if backend != "torch":
+        try:
+            import onnxruntime
+            import optimum  # noqa: F401  (used by sentence-transformers to run the export)
+        except ImportError as e:
+            if backend == "onnx-int8":
+                raise ImportError(f"The onnx-int8 embedding backend needs onnxruntime and optimum ({e}); "
+                                  "install them or choose another backend") from e
+            print(f"Warning: {backend} embedding backend unavailable ({e}); using torch")
+            backend = "torch"
+    if backend == "torch":
+        return SentenceTransformer(model_name, **model_kwargs), backend
+
+    onnx_kwargs = {"provider": "CPUExecutionProvider"}
+    if backend == "onnx-int8":
+        onnx_kwargs["file_name"] = ONNX_INT8_FILE
+    if threads:
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        onnx_kwargs["session_options"] = options
+    return SentenceTransformer(model_name, backend="onnx", model_kwargs=onnx_kwargs, **model_kwargs), backend
+
+def load_encoder(model_name, backend="torch", threads=None, max_batch=MAX_BATCH, **model_kwargs):
+    model, backend = load_sentence_transformer(model_name, backend, threads, **model_kwargs)
+    return BucketedEncoder(model, backend, max_batch)
+
+# -----------------------------
+# Length-bucketed encoding
+# -----------------------------
+class BucketedEncoder:
+    """Wraps a SentenceTransformer so each encode batch holds texts of similar length.
+
+    Texts are sorted by token count and cut into batches with a padded size
+    of at most batch_size * max_seq_length tokens. A batch of full-length
+    resumes therefore holds batch_size texts, and a batch of 3-token skills
+    holds up to max_batch. Vectors come back in input order and match
+    SentenceTransformer.encode to float rounding.
+    """
+
+    def __init__(self, model, backend="torch", max_batch=MAX_BATCH):
+        self.model = model
+        self.backend = backend
+        self.max_batch = max_batch
+
+    @property
+    def max_seq_length(self):
+        return getattr(self.model, "max_seq_length", None) or DEFAULT_MAX_SEQ_LENGTH
+
+    def token_lengths(self, texts):
+        """Tokens per text after truncation, special tokens included."""
+        limit = self.max_seq_length
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            # About four characters per word piece in English text
+            return np.array([min(len(t) // 4 + 2, limit) for t in texts], dtype=np.int64)
+        input_ids = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=limit)["input_ids"]
+        return np.array([len(ids) for ids in input_ids], dtype=np.int64)
+
+    def batches(self, lengths, batch_size):
+        """Index arrays into the inputs, longest texts first, each within the token budget."""
+        order = np.argsort(-lengths, kind="stable")
+        budget = batch_size * self.max_seq_length
+        start = 0
+        while start < len(order):
+            # Sorted longest first, so the first text sets the batch's padded length
+            size = min(self.max_batch, max(1, budget // max(int(lengths[order[start]]), 1)))
+            yield order[start:start + size]
+            start += size
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        if set(kwargs) - _BUCKETED_KWARGS:
+            # Tensor or token-level output is passed through unbucketed
+            return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if len(texts) <= 1:
+            return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+
+        lengths = self.token_lengths(texts)
+        embeddings = None
+        for rows in self.batches(lengths, batch_size):
+            instrumentation.observe("encode_bucket_size", len(rows))
+            vectors = np.asarray(self.model.encode([texts[i] for i in rows], batch_size=len(rows), **kwargs))
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=vectors.dtype)
+            embeddings[rows] = vectors
+        return embeddings
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+# -----------------------------
+# Tolerance check
+# -----------------------------
+def compare_encoders(reference, candidate, texts, batch_size=32):
+    """Agreement of candidate.encode with reference.encode on texts, plus both timings."""
+    start = time.perf_counter()
+    expected = np.asarray(reference.encode(texts, batch_size=batch_size), dtype=np.float32)
+    reference_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = np.asarray(candidate.encode(texts, batch_size=batch_size), dtype=np.float32)
+    candidate_seconds = time.perf_counter() - start
+    norms = np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    norms[norms == 0] = 1.0
+    cosine = (expected * actual).sum(axis=1) / norms
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+        "reference_seconds": round(reference_seconds, 3),
+        "candidate_seconds": round(candidate_seconds, 3)
+    }
+
+def sample_texts(n_resumes=200, seed=0):
+    """A mixed-length workload like the pipeline's: synthetic resumes plus skill phrases."""
+    from synthetic_corpus import resume_text, SKILLS
+    rng = random.Random(seed)
+    return [resume_text(rng) for _ in range(n_resumes)] + SKILLS * 4
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check an embedding backend against SentenceTransformer.encode and time both"
+    )
+    parser.add_argument("--model", default=None, help="model name (default: resources.EMBEDDING_MODEL_NAME)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--threads", type=int, help="CPU threads for inference")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--resumes", type=int, default=200, help="synthetic resumes in the workload")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="max allowed 1 - cosine")
+    args = parser.parse_args(argv)
+
+    from sentence_transformers import SentenceTransformer
+    import resources
+    model_name = args.model or resources.EMBEDDING_MODEL_NAME
+    set_threads(args.threads)
+    reference = SentenceTransformer(model_name)
+    candidate = load_encoder(model_name, args.backend, args.threads)
+    report = compare_encoders(reference, candidate, sample_texts(args.resumes), args.batch_size)
+    print(f"{candidate.backend} (bucketed) vs SentenceTransformer.encode on {report['texts']} texts:")
+    print(f"  min cosine {report['min_cosine']:.6f}, mean cosine {report['mean_cosine']:.6f}, "
+          f"max abs diff {report['max_abs_diff']:.2e}")
+    print(f"  reference {report['reference_seconds']:.2f}s, candidate {report['candidate_seconds']:.2f}s "
+          f"({report['reference_seconds'] / max(report['candidate_seconds'], 1e-9):.2f}x)")
+    if 1 - report["min_cosine"] > args.tolerance:
+        print(f"FAILED: 1 - min cosine exceeds tolerance {args.tolerance}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# embedding_cache.py
+import hashlib
+import sqlite3
+import threading
+import time
+import numpy as np
+import instrumentation
+
+CACHE_FILE = "embedding_cache.db"  # SQLite file holding cached embeddings
+MAX_ENTRIES = 200_000              # size cap, least recently used rows are evicted first
+TOUCH_FLUSH = 1000                 # cache hits whose last-used stamps are written together
+
+# Several batch_score worker processes share one cache file: WAL lets them read
+# while one writes, and busy_timeout makes writers wait instead of failing.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 30000,
+}
+
+# encode() options that do not change the returned vectors
+_PASSTHROUGH_KWARGS = {"batch_size", "show_progress_bar"}
+
+def text_key(model_name, text):
+    """Content hash of a text, namespaced by the model that embeds it."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+# -----------------------------
+# SQLite embedding store
+# -----------------------------
+class EmbeddingCache:
+    """On-disk embedding store keyed by content hash and model name.
+
+    The model name is recorded in the database; opening the cache with a
+    different model clears it. Rows carry a last-used stamp and the oldest
+    rows are evicted once the cache grows past max_entries. Reads never
+    write: the stamps of cache hits are buffered and written with the next
+    put_many, every TOUCH_FLUSH hits, or on close.
+    """
+
+    def __init__(self, model_name, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last-used stamp not yet written
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        for name, value in PRAGMAS.items():
+            self._conn.execute(f"PRAGMA {name} = {value}")
+        self._init_db()
+
+    def _init_db(self):
+        cursor = self._conn.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            vector BLOB,
+            last_used REAL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        row = cursor.execute("SELECT value FROM meta WHERE key = 'model_name'").fetchone()
+        if row is None or row[0] != self.model_name:
+            # Model changed: every stored vector is stale
+            cursor.execute("DELETE FROM embeddings")
+            cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('model_name', ?)", (self.model_name,))
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present in the cache."""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            cursor = self._conn.cursor()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = cursor.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._touched.update((k, now) for k in found)
+                if len(self._touched) >= TOUCH_FLUSH:
+                    self._flush_touched(cursor)
+                    self._conn.commit()
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def _flush_touched(self, cursor):
+        # Caller holds the lock and commits
+        if self._touched:
+            cursor.executemany(
+                "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE key = ?",
+                [(stamp, key) for key, stamp in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def put_many(self, items):
+        """Store (key, vector) pairs and evict down to max_entries."""
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        with self._lock:
+            cursor = self._conn.cursor()
+            # Pending stamps go first so eviction sees recent hits
+            self._flush_touched(cursor)
+            cursor.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            count = cursor.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                cursor.execute("""
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+                )
+                """, (count - self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched(self._conn.cursor())
+            self._conn.commit()
+            self._conn.close()
+
+# -----------------------------
+# Caching wrapper around the model
+# -----------------------------
+class CachedEncoder:
+    """Drop-in replacement for SentenceTransformer.encode backed by EmbeddingCache.
+
+    Only texts missing from the cache are sent to the model, in one batch.
+    """
+
+    def __init__(self, model, model_name, cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache if cache is not None else EmbeddingCache(model_name)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        if set(kwargs) - _PASSTHROUGH_KWARGS:
+            # Tensor output, normalization etc. are not cached
+            return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self.model.encode(texts, batch_size=batch_size, **kwargs)
+
+        keys = [text_key(self.model_name, t) for t in texts]
+        cached = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        instrumentation.count("embedding_cache.hits", len(set(keys)) - len(missing))
+        instrumentation.count("embedding_cache.misses", len(missing))
+        if missing:
+            instrumentation.observe("encode_batch_size", len(missing))
+            with instrumentation.timed("embed", len(missing)):
+                new_embeddings = self.model.encode(list(missing.values()), batch_size=batch_size, **kwargs)
+            new_items = list(zip(missing.keys(), new_embeddings))
+            self.cache.put_many(new_items)
+            cached.update((k, np.asarray(v, dtype=np.float32)) for k, v in new_items)
+
+        embeddings = np.vstack([cached[k] for k in keys])
+        return embeddings[0] if single else embeddings
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+def load_cached_model(model_name, path=CACHE_FILE, max_entries=MAX_ENTRIES, backend="torch", threads=None,
+                      **model_kwargs):
+    """Load a length-bucketed SentenceTransformer wrapped with the persistent embedding cache.
+
+    backend and threads select the inference backend (see embedding_backend);
+    model_kwargs are passed to SentenceTransformer (e.g. local_files_only).
+    """
+    from embedding_backend import load_encoder, model_id
+    model = load_encoder(model_name, backend, threads, **model_kwargs)
+    cache_name = model_id(model_name, model.backend)
+    cache = EmbeddingCache(cache_name, path=path, max_entries=max_entries)
+    return CachedEncoder(model, cache_name, cache=cache)
@@ -0,0 +1,359 @@
+# embedding_store.py
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+STORE_DIR = "resume_embeddings"  # on-disk embedding store for the resume corpus
+DTYPES = ("float16", "int8")
+SEARCH_BLOCK = 65536             # rows scored per step; bounds scratch memory during a scan
+ACCURACY_SAMPLE = 2000           # float32 rows kept while writing to measure quantization error
+ACCURACY_K = 10
+
+# Data files carry the store generation (vectors.3.bin); meta.json names the current one
+VECTORS_FILE = "vectors.bin"
+SCALES_FILE = "scales.bin"
+IDS_FILE = "ids.json"
+META_FILE = "meta.json"
+DATA_FILES = (VECTORS_FILE, SCALES_FILE, IDS_FILE)
+
+def generation_file(path, name, generation):
+    """Path of a data file for a store generation (None: stores written before generations)."""
+    if generation is None:
+        return os.path.join(path, name)
+    root, ext = os.path.splitext(name)
+    return os.path.join(path, f"{root}.{generation}{ext}")
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+# -----------------------------
+# Quantization
+# -----------------------------
+def quantize(vectors, dtype):
+    """(codes, scales) for unit float32 rows; scales is None for float16.
+
+    int8 uses one symmetric scale per row (max |x| / 127), so a row is
+    recovered as codes * scale.
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def dequantize(codes, scales=None):
+    vectors = np.asarray(codes, dtype=np.float32)
+    return vectors if scales is None else vectors * np.asarray(scales, dtype=np.float32)[:, None]
+
+def _top_k(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+def measure_accuracy(reference, codes, scales=None, n_queries=100, k=ACCURACY_K):
+    """Quantization error of codes against the float32 unit rows they were made from.
+
+    Reports the cosine between each original row and its reconstruction,
+    the absolute error of query-row cosine scores (queries are the first
+    n_queries rows) and recall@k of the quantized ranking against the
+    exact float32 one.
+    """
+    reference = _normalize(reference)
+    approx = dequantize(codes, scales)
+    n = len(reference)
+    if not n:
+        return {}
+    norms = np.linalg.norm(approx, axis=1)
+    norms[norms == 0] = 1.0
+    row_cosine = (reference * approx).sum(axis=1) / norms
+    queries = reference[:min(n_queries, n)]
+    exact = queries @ reference.T
+    quantized = queries @ approx.T
+    error = np.abs(exact - quantized)
+    k = min(k, n)
+    recall = np.mean([
+        len(set(_top_k(e, k).tolist()) & set(_top_k(q, k).tolist())) / k for e, q in zip(exact, quantized)
+    ])
+    return {
+        "rows": int(n),
+        "queries": int(len(queries)),
+        "min_row_cosine": round(float(row_cosine.min()), 6),
+        "mean_row_cosine": round(float(row_cosine.mean()), 6),
+        "max_score_error": round(float(error.max()), 6),
+        "mean_score_error": round(float(error.mean()), 6),
+        f"recall_at_{k}": round(float(recall), 4)
+    }
+
+# -----------------------------
+# Writing
+# -----------------------------
+class EmbeddingStoreWriter:
+    """Streams (ids, vectors) chunks into a new store at path.
+
+    Rows are normalized, quantized and appended to the vector file as they
+    arrive, so a corpus never has to fit in memory as float32. A sample of
+    the float32 rows is kept to measure accuracy when the writer closes.
+    The data files belong to a new generation written next to the current
+    one, and close() publishes it with a single atomic replace of
+    meta.json. A reader therefore sees one whole generation, old or new,
+    never a mix. The previous generation is kept for readers that are
+    opening it; older ones are deleted.
+    """
+
+    def __init__(self, path=STORE_DIR, dtype="int8", model_name=None, accuracy_sample=ACCURACY_SAMPLE):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, not {dtype!r}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dtype = dtype
+        self.model_name = model_name
+        self.accuracy_sample = accuracy_sample
+        self.dim = None
+        self.ids = []
+        self._seen = set()
+        self._reference, self._codes, self._scales = [], [], []
+        self._sampled = 0
+        has_meta = os.path.exists(os.path.join(path, META_FILE))
+        self.previous = read_meta(path).get("generation") if has_meta else None  # None: none, or no generation
+        self.generation = (self.previous or 0) + 1
+        # "x": a second writer racing for the same generation fails instead of interleaving
+        self._vectors_file = open(self._file(VECTORS_FILE), "xb")
+        self._scales_file = open(self._file(SCALES_FILE), "xb") if dtype == "int8" else None
+
+    def _file(self, name):
+        return generation_file(self.path, name, self.generation)
+
+    def add(self, ids, vectors):
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = _normalize(vectors)
+        if len(vectors) != len(ids):
+            raise ValueError(f"{len(ids)} ids for {len(vectors)} vectors")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        duplicates = [i for i in ids if i in self._seen]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate ids in embedding store: {duplicates[:5] or ids[:5]}")
+        self._seen.update(ids)
+        self.ids.extend(ids)
+
+        codes, scales = quantize(vectors, self.dtype)
+        self._vectors_file.write(codes.tobytes())
+        if scales is not None:
+            self._scales_file.write(scales.tobytes())
+        take = min(len(ids), self.accuracy_sample - self._sampled)
+        if take > 0:
+            self._reference.append(vectors[:take])
+            self._codes.append(codes[:take])
+            self._scales.append(scales[:take] if scales is not None else None)
+            self._sampled += take
+
+    def close(self):
+        """Finish the store and return its metadata."""
+        self._vectors_file.close()
+        if self._scales_file is not None:
+            self._scales_file.close()
+        accuracy = {}
+        if self._reference:
+            scales = None if self.dtype == "float16" else np.concatenate(self._scales)
+            accuracy = measure_accuracy(np.vstack(self._reference), np.vstack(self._codes), scales)
+        meta = {"dtype": self.dtype, "dim": self.dim or 0, "count": len(self.ids),
+                "model_name": self.model_name, "generation": self.generation, "accuracy": accuracy}
+        with open(self._file(IDS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        # The one replace that publishes the generation
+        meta_tmp = os.path.join(self.path, f"{META_FILE}.tmp")
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_tmp, os.path.join(self.path, META_FILE))
+        self._remove_generations(keep=(self.generation, self.previous))
+        return meta
+
+    def _remove_generations(self, keep):
+        """Delete data files of every generation not in keep (None: files without a generation)."""
+        for name in os.listdir(self.path):
+            for data_file in DATA_FILES:
+                root, ext = os.path.splitext(data_file)
+                if name == data_file:
+                    generation = None
+                elif name.startswith(f"{root}.") and name.endswith(ext) and name[len(root) + 1:-len(ext)].isdigit():
+                    generation = int(name[len(root) + 1:-len(ext)])
+                else:
+                    continue
+                if generation not in keep:
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except OSError:
+                        pass  # still mapped by a reader on Windows; removed by a later write
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._vectors_file.close()
+            if self._scales_file is not None:
+                self._scales_file.close()
+            self._remove_generations(keep=(self.previous,))
+        return False
+
+def write_store(path, ids, vectors, dtype="int8", model_name=None):
+    """Write a whole {ids, float32 vectors} store in one go; returns its metadata."""
+    writer = EmbeddingStoreWriter(path, dtype, model_name)
+    writer.add(ids, vectors)
+    return writer.close()
+
+# -----------------------------
+# Reading and search
+# -----------------------------
+class EmbeddingStore:
+    """Read-only, memory-mapped view of a store written by EmbeddingStoreWriter.
+
+    The quantized matrix is mapped, not read: opening costs the id map only,
+    pages are loaded on demand and shared through the OS page cache by every
+    process that maps the same file. Pickling a store (e.g. to hand it to a
+    worker process) sends just its path; the worker maps the file again.
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        # meta.json is read once; every data file opened after it belongs to its generation
+        self.meta = read_meta(path)
+        self.generation = self.meta.get("generation")
+        with open(self._file(IDS_FILE), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+        self.dtype = self.meta["dtype"]
+        self.dim = self.meta["dim"]
+        count = self.meta["count"]
+        self.id_rows = {id_: n for n, id_ in enumerate(self.ids)}
+        if count:
+            self.vectors = np.memmap(self._file(VECTORS_FILE), dtype=self.dtype, mode="r", shape=(count, self.dim))
+            self.scales = (np.memmap(self._file(SCALES_FILE), dtype=np.float32, mode="r", shape=(count,))
+                           if self.dtype == "int8" else None)
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=self.dtype)
+            self.scales = np.zeros(0, dtype=np.float32) if self.dtype == "int8" else None
+
+    def _file(self, name):
+        return generation_file(self.path, name, self.generation)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __reduce__(self):
+        return (self.__class__, (self.path,))
+
+    @property
+    def accuracy(self):
+        """Quantization error measured when the store was written (see measure_accuracy)."""
+        return self.meta.get("accuracy", {})
+
+    def get(self, ids):
+        """Dequantized float32 rows for the given ids."""
+        rows = np.array([self.id_rows[i] for i in ids], dtype=np.int64)
+        return dequantize(self.vectors[rows], self.scales[rows] if self.scales is not None else None)
+
+    def _block_scores(self, start, stop, queries):
+        # Only this block is converted to float32; the mapped matrix itself is never copied
+        scores = np.asarray(self.vectors[start:stop], dtype=np.float32) @ queries.T
+        if self.scales is not None:
+            scores *= self.scales[start:stop, None]
+        return scores
+
+    def scores(self, queries, block=SEARCH_BLOCK):
+        """(n_queries, len(store)) dot products of the unit queries with every stored row."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        out = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), block):
+            stop = min(start + block, len(self))
+            out[:, start:stop] = self._block_scores(start, stop, queries).T
+        return out
+
+    def search_many(self, queries, k=10, block=SEARCH_BLOCK):
+        """Top-k [(id, score)] per query, best first, from one exact scan of the store.
+
+        Only the running top-k of each query is kept between blocks, so
+        memory stays at one block whatever the corpus size.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_rows = [np.zeros(0, dtype=np.int64) for _ in queries]
+        best_scores = [np.zeros(0, dtype=np.float32) for _ in queries]
+        for start in range(0, len(self), block):
+            stop = min(start + block, len(self))
+            block_scores = self._block_scores(start, stop, queries)
+            for q in range(len(queries)):
+                column = block_scores[:, q]
+                top = _top_k(column, k)
+                rows = np.concatenate([best_rows[q], top + start])
+                scores = np.concatenate([best_scores[q], column[top]])
+                keep = _top_k(scores, k)
+                best_rows[q], best_scores[q] = rows[keep], scores[keep]
+        return [[(self.ids[r], float(s)) for r, s in zip(rows, scores)]
+                for rows, scores in zip(best_rows, best_scores)]
+
+    def search(self, query, k=10, nprobe=None):
+        """Top-k (id, score) by dot product with query, best first.
+
+        Stored rows are unit length, so a unit query gives cosine scores.
+        The scan is always exact; nprobe is accepted so the store can stand
+        in for a vector_index.VectorIndex.
+        """
+        return self.search_many(np.asarray(query, dtype=np.float32).reshape(1, -1), k)[0]
+
+    def measure_accuracy(self, ids, reference, n_queries=100, k=ACCURACY_K):
+        """measure_accuracy for stored rows against float32 vectors supplied by the caller."""
+        rows = np.array([self.id_rows[i] for i in ids], dtype=np.int64)
+        return measure_accuracy(reference, self.vectors[rows],
+                                self.scales[rows] if self.scales is not None else None, n_queries, k)
+
+    def report(self):
+        size = os.path.getsize(self._file(VECTORS_FILE)) if len(self) else 0
+        lines = [f"{self.path}: {len(self)} vectors x {self.dim} ({self.dtype}), {size / 2 ** 20:.1f} MiB "
+                 f"(float32 would be {len(self) * self.dim * 4 / 2 ** 20:.1f} MiB)"]
+        if self.meta.get("model_name"):
+            lines.append(f"Model: {self.meta['model_name']}")
+        for name, value in self.accuracy.items():
+            lines.append(f"  {name}: {value}")
+        return "\n".join(lines)
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the resume embedding store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="embed a resume folder into a store")
+    build.add_argument("resume_folder")
+    build.add_argument("--store", default=STORE_DIR)
+    build.add_argument("--dtype", choices=DTYPES, default="int8")
+    build.add_argument("--chunk-size", type=int, default=256, help="resumes extracted and embedded per step")
+    build.add_argument("--batch-size", type=int, default=256, help="encoder batch size")
+    info = sub.add_parser("info", help="print size and measured accuracy of a store")
+    info.add_argument("--store", default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from integrated_pipeline import build_embedding_store
+        build_embedding_store(args.resume_folder, args.store, args.dtype, args.chunk_size, args.batch_size)
+    print(EmbeddingStore(args.store).report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,9 @@
 import os
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-
-nltk.download('punkt')
-nltk.download('stopwords')
+from text_normalization import tokenize
+from tfidf_model import load_or_fit
 
 # Predefined JD skills
 JD_SKILLS = ['Python', 'SQL', 'Pandas', 'NumPy', 'Power BI', 'Matplotlib', 'Seaborn', 
@@ -16,17 +12,17 @@ JD_SKILLS = ['Python', 'SQL', 'Pandas', 'NumPy', 'Power BI', 'Matplotlib', 'Seab
 # Paths
 JD_FOLDER = './JDS/'
 RESUME_FOLDER = './'
-
-stop_words = set(stopwords.words('english'))
+TFIDF_FILE = 'tfidf_hard_match.pkl'
 
 def read_text_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return f.read()
 
 def extract_skills(resume_text):
-    words = set([w.lower() for w in word_tokenize(resume_text) if w.isalpha()])
-    matched_skills = [skill for skill in JD_SKILLS if skill.lower() in words]
-    return matched_skills
+    # Skills are compared with single alphabetic tokens, so multi-word and
+    # punctuated skills ("Power BI", "Scikit-learn") never match; one set lookup each
+    words = {w.lower() for w in tokenize(resume_text) if w.isalpha()}
+    return [skill for skill in JD_SKILLS if skill.lower() in words]
 
 def extract_projects(resume_text):
     projects = []
@@ -55,7 +51,10 @@ def calculate_skill_score(matched_skills):
         return 0
     return round(len(matched_skills) / len(JD_SKILLS) * 100, 2)
 
-def calculate_semantic_similarity(jd_text, resume_text):
+def calculate_semantic_similarity(jd_text, resume_text, tfidf=None):
+    # tfidf: optional corpus-fitted tfidf_model.CorpusTfidf; otherwise fit on just this pair
+    if tfidf is not None:
+        return round(tfidf.similarity(jd_text, resume_text), 3)
     vectorizer = TfidfVectorizer(stop_words='english')
     vectors = vectorizer.fit_transform([jd_text, resume_text])
     similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
@@ -78,39 +77,47 @@ def generate_suggestions(matched_skills, projects, certifications):
     return suggestions
 
 # Main script
-jd_files = [os.path.join(JD_FOLDER, f) for f in os.listdir(JD_FOLDER) if f.endswith('.txt')]
-resume_files = [os.path.join(RESUME_FOLDER, f) for f in os.listdir(RESUME_FOLDER) if f.endswith('.txt') and 'JD' not in f]
+def main():
+    jd_files = [os.path.join(JD_FOLDER, f) for f in os.listdir(JD_FOLDER) if f.endswith('.txt')]
+    resume_files = [os.path.join(RESUME_FOLDER, f) for f in os.listdir(RESUME_FOLDER) if f.endswith('.txt') and 'JD' not in f]
+
+    print(f"Found JD files: {jd_files}")
+    print(f"Found Resume files: {resume_files}\n")
 
-print(f"Found JD files: {jd_files}")
-print(f"Found Resume files: {resume_files}\n")
+    jd_texts = [read_text_file(f) for f in jd_files]
+    resume_texts = [read_text_file(f) for f in resume_files]
 
-for jd_file in jd_files:
-    jd_text = read_text_file(jd_file)
-    print(f"--- Relevance for {os.path.basename(jd_file)} ---\n")
+    # TF-IDF fitted once on the whole corpus; all resume x JD scores in one sparse product
+    tfidf = load_or_fit(jd_texts + resume_texts, TFIDF_FILE, stop_words='english')
+    semantic_scores = tfidf.similarity_matrix(resume_texts, jd_texts)
+
+    for j, (jd_file, jd_text) in enumerate(zip(jd_files, jd_texts)):
+        print(f"--- Relevance for {os.path.basename(jd_file)} ---\n")
     
-    for resume_file in resume_files:
-        resume_text = read_text_file(resume_file)
+        for i, (resume_file, resume_text) in enumerate(zip(resume_files, resume_texts)):
         
-        matched_skills = extract_skills(resume_text)
-        projects = extract_projects(resume_text)
-        certifications = extract_certifications(resume_text)
+            matched_skills = extract_skills(resume_text)
+            projects = extract_projects(resume_text)
+            certifications = extract_certifications(resume_text)
         
-        skill_score = calculate_skill_score(matched_skills)
-        semantic_score = calculate_semantic_similarity(jd_text, resume_text)
-        # Bonus points if projects or certifications exist
-        project_bonus = 5 if projects else 0
-        cert_bonus = 5 if certifications else 0
-        total_score = calculate_total_score(skill_score, semantic_score, project_bonus, cert_bonus)
+            skill_score = calculate_skill_score(matched_skills)
+            semantic_score = round(semantic_scores[i, j], 3)
+            # Bonus points if projects or certifications exist
+            project_bonus = 5 if projects else 0
+            cert_bonus = 5 if certifications else 0
+            total_score = calculate_total_score(skill_score, semantic_score, project_bonus, cert_bonus)
         
-        suggestions = generate_suggestions(matched_skills, projects, certifications)
-        verdict = "High" if total_score > 70 else "Medium" if total_score > 40 else "Low"
+            suggestions = generate_suggestions(matched_skills, projects, certifications)
+            verdict = "High" if total_score > 70 else "Medium" if total_score > 40 else "Low"
         
-        print(f"Resume: {os.path.basename(resume_file)}")
-        print(f"Matched skills: {matched_skills} ({skill_score}%)")
-        print(f"Semantic similarity: {semantic_score}")
-        print(f"Projects found: {projects}")
-        print(f"Certifications found: {certifications}")
-        print(f"Suggestions: {suggestions}")
-        print(f"Total relevance score: {total_score}")
-        print(f"Verdict: {verdict}\n")
-
+            print(f"Resume: {os.path.basename(resume_file)}")
+            print(f"Matched skills: {matched_skills} ({skill_score}%)")
+            print(f"Semantic similarity: {semantic_score}")
+            print(f"Projects found: {projects}")
+            print(f"Certifications found: {certifications}")
+            print(f"Suggestions: {suggestions}")
+            print(f"Total relevance score: {total_score}")
+            print(f"Verdict: {verdict}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# instrumentation.py
+import json
+import os
+import threading
+import time
+
+# Off by default; RESUME_CHECK_METRICS=1 or enable() turns recording on.
+# While disabled every hook returns straight away.
+ENABLED = os.environ.get("RESUME_CHECK_METRICS") == "1"
+METRIC_PREFIX = "resume_check"
+
+_lock = threading.Lock()
+_stages = {}        # stage -> [calls, seconds, items, max_seconds]
+_counters = {}      # name -> value
+_observations = {}  # name -> [count, sum, min, max]
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+def is_enabled():
+    return ENABLED
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _observations.clear()
+
+# -----------------------------
+# Hooks
+# -----------------------------
+class _StageTimer:
+    __slots__ = ("stage", "items", "start")
+
+    def __init__(self, stage, items):
+        self.stage = stage
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.start, self.items)
+        return False
+
+class _NullTimer:
+    # Shared no-op stand-in used while disabled; `items` may still be assigned
+    items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timed(stage, items=1):
+    """Context manager timing one call of a stage; set .items inside the block if only known later."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _StageTimer(stage, items)
+
+def record(stage, seconds, items=1):
+    """Add one call of `stage` that took `seconds` and processed `items` documents/pairs."""
+    with _lock:
+        stat = _stages.get(stage)
+        if stat is None:
+            stat = _stages[stage] = [0, 0.0, 0, 0.0]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] += items
+        stat[3] = max(stat[3], seconds)
+
+def count(name, n=1):
+    """Increment a counter (cache hits, misses, errors, ...)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def observe(name, value):
+    """Record one value of a distribution, e.g. an encode batch size."""
+    if not ENABLED:
+        return
+    with _lock:
+        obs = _observations.get(name)
+        if obs is None:
+            _observations[name] = [1, value, value, value]
+        else:
+            obs[0] += 1
+            obs[1] += value
+            obs[2] = min(obs[2], value)
+            obs[3] = max(obs[3], value)
+
+# -----------------------------
+# Snapshots and export
+# -----------------------------
+def snapshot():
+    """All recorded metrics as a JSON-serializable dict.
+
+    Cache hit rates are derived from counter pairs named <cache>.hits and
+    <cache>.misses.
+    """
+    with _lock:
+        stages = {
+            stage: {
+                "calls": calls,
+                "seconds": round(seconds, 6),
+                "items": items,
+                "items_per_second": round(items / seconds, 2) if seconds else None,
+                "max_seconds": round(max_seconds, 6)
+            }
+            for stage, (calls, seconds, items, max_seconds) in _stages.items()
+        }
+        counters = dict(_counters)
+        observations = {
+            name: {"count": n, "sum": total, "mean": total / n, "min": low, "max": high}
+            for name, (n, total, low, high) in _observations.items()
+        }
+    hit_rates = {}
+    for name in counters:
+        if name.endswith(".hits"):
+            cache = name[:-len(".hits")]
+            lookups = counters[name] + counters.get(f"{cache}.misses", 0)
+            hit_rates[cache] = round(counters[name] / lookups, 4) if lookups else None
+    return {"stages": stages, "counters": counters, "cache_hit_rates": hit_rates, "observations": observations}
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+def to_prometheus(snap=None):
+    """Metrics in the Prometheus text exposition format (e.g. for the node_exporter textfile collector)."""
+    snap = snap or snapshot()
+    p = METRIC_PREFIX
+    lines = []
+    # Each metric family is written as one group, as the format requires
+    families = [("calls", "stage_calls_total", "counter"), ("seconds", "stage_seconds_total", "counter"),
+                ("items", "stage_items_total", "counter"), ("max_seconds", "stage_max_seconds", "gauge")]
+    for field, metric, kind in families:
+        lines.append(f"# TYPE {p}_{metric} {kind}")
+        for stage, s in sorted(snap["stages"].items()):
+            lines.append(f'{p}_{metric}{{stage="{_label(stage)}"}} {s[field]}')
+    for name, value in sorted(snap["counters"].items()):
+        metric = f"{p}_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for cache, rate in sorted(snap["cache_hit_rates"].items()):
+        if rate is not None:
+            metric = f"{p}_{_metric_name(cache)}_hit_ratio"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {rate}"]
+    for name, o in sorted(snap["observations"].items()):
+        metric = f"{p}_{_metric_name(name)}"
+        lines += [f"# TYPE {metric} summary", f"{metric}_count {o['count']}", f"{metric}_sum {o['sum']}"]
+    return "\n".join(lines) + "\n"
+
+def _write_atomic(path, text):
+    # Scrapers must never read a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_prometheus(path):
+    _write_atomic(path, to_prometheus())
+
+def write_json(path):
+    _write_atomic(path, json.dumps(snapshot(), indent=2))
+
+def summary_table(snap=None):
+    """Human readable per-stage summary, slowest stage first."""
+    snap = snap or snapshot()
+    lines = [f"{'Stage':<22}{'Calls':>8}{'Seconds':>11}{'Items':>10}{'Items/s':>12}"]
+    for stage, s in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+        lines.append(f"{stage:<22}{s['calls']:>8}{s['seconds']:>11.3f}{s['items']:>10}"
+                     f"{s['items_per_second'] or 0:>12.1f}")
+    for cache, rate in sorted(snap["cache_hit_rates"].items()):
+        lines.append(f"{cache} hit rate: {rate:.1%}" if rate is not None else f"{cache} hit rate: n/a")
+    for name, o in sorted(snap["observations"].items()):
+        lines.append(f"{name}: mean {o['mean']:.1f}, min {o['min']}, max {o['max']} over {o['count']}")
+    return "\n".join(lines)
@@ -3,29 +3,59 @@
 import os
 import re
 import numpy as np
-from parse_files import parse_resumes
+import json
+from contextlib import contextmanager
+from parse_files import parse_resumes, get_all_resumes, extract_documents
 from parse_jds import parse_all_jds
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+import resources
+import instrumentation
+from score_manifest import ScoreManifest, MANIFEST_FILE, text_hash, role_hash
+from skill_matcher import get_matcher
+from skill_vectors import RoleSkillLayout
+from embedding_backend import model_id
 
 # -----------------------------
-# Load embedding model once
+# Embedding model (loaded on first use)
 # -----------------------------
-model = SentenceTransformer('all-MiniLM-L6-v2')
+MODEL_NAME = resources.EMBEDDING_MODEL_NAME
+
+def get_model():
+    """The shared embedding model; embeddings persist in embedding_cache.db."""
+    return resources.get("embedding_model")
+
+def __getattr__(name):
+    # Keeps `integrated_pipeline.model` working without loading it at import time
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Bump when scoring logic changes so incremental runs rescore everything. The
+# configured backend is the loaded one: onnx-int8 never falls back to torch.
+SCORER_VERSION = f"1:{model_id(MODEL_NAME, resources.EMBEDDING_BACKEND)}"
 
 # -----------------------------
 # Hard match function
 # -----------------------------
 def compute_hard_match(resume_text, jd_skills):
+    return hard_match_details(resume_text, jd_skills)[0]
+
+def hard_match_details(resume_text, jd_skills, present=None):
+    """Hard match score and missing skills from one pass over the resume.
+
+    present is an optional SkillMatcher.find() result covering jd_skills,
+    so one scan of a resume can serve every role.
+    """
     if not jd_skills:
-        return 0
-    resume_text_lower = resume_text.lower()
-    matched = 0
-    for skill in jd_skills:
-        if skill.lower() in resume_text_lower:
-            matched += 1
-    score = (matched / len(jd_skills)) * 100
-    return round(score, 2)
+        return 0, []
+    with instrumentation.timed("hard_match"):
+        matcher = get_matcher(jd_skills)
+        if present is None:
+            present = matcher.find(resume_text)
+        matched, missing = matcher.partition(present, jd_skills)
+        score = (len(matched) / len(jd_skills)) * 100
+    return round(score, 2), missing
 
 # -----------------------------
 # Semantic similarity
@@ -33,37 +63,119 @@ def compute_hard_match(resume_text, jd_skills):
 def semantic_similarity_jd_resume(jd_skills, resume_text):
     if not jd_skills:
         return 0.0
-    jd_embeddings = model.encode(jd_skills)
-    resume_embedding = model.encode([resume_text])
-    similarities = cosine_similarity(jd_embeddings, resume_embedding)
+    jd_embeddings = get_model().encode(jd_skills)
+    resume_embedding = get_model().encode([resume_text])
+    with instrumentation.timed("similarity"):
+        similarities = cosine_similarity(jd_embeddings, resume_embedding)
     avg_sim = np.mean(similarities) * 100
     return round(avg_sim, 2)
 
 # -----------------------------
 # Weighted score
 # -----------------------------
+def combine_scores(hard, semantic):
+    return round(0.5 * hard + 0.5 * semantic, 2)
+
 def compute_weighted_score(resume_text, jd_text, jd_skills):
     hard = compute_hard_match(resume_text, jd_skills)
     semantic = semantic_similarity_jd_resume(jd_skills, resume_text)
-    return round(0.5 * hard + 0.5 * semantic, 2)
+    return combine_scores(hard, semantic)
+
+# -----------------------------
+# Batched semantic similarity
+# -----------------------------
+def embed_role_skills(roles_skills, batch_size=256):
+    """Embed every unique skill across all roles once.
+
+    Returns (skill_embeddings, role_rows): role_rows[i] lists the rows of
+    skill_embeddings that belong to role i. skill_embeddings is None when no
+    role has any skills.
+    """
+    unique_skills = list(dict.fromkeys(s for skills in roles_skills for s in skills))
+    skill_rows = {skill: i for i, skill in enumerate(unique_skills)}
+    role_rows = [[skill_rows[s] for s in skills] for skills in roles_skills]
+    if not unique_skills:
+        return None, role_rows
+    return get_model().encode(unique_skills, batch_size=batch_size), role_rows
+
+def semantic_score_matrix(resume_texts, roles_skills, batch_size=256, role_embeddings=None):
+    """Semantic scores for every resume x role pair, encoding each text once.
+
+    Every resume and every unique JD skill is embedded in large batches and all
+    similarities come from a single cosine matrix. Returns a float32 array
+    (resumes x roles) equal to semantic_similarity_jd_resume per pair up to
+    float rounding: the matrix product sums in a different order, which can
+    move a rounded score by 0.01. role_embeddings is an optional embed_role_skills result to reuse across calls.
+    """
+    scores = np.zeros((len(resume_texts), len(roles_skills)), dtype=np.float32)
+    if not len(resume_texts):
+        return scores
+    if role_embeddings is None:
+        role_embeddings = embed_role_skills(roles_skills, batch_size)
+    skill_embeddings, role_rows = role_embeddings
+    if skill_embeddings is None:
+        return scores
+
+    resume_embeddings = get_model().encode(list(resume_texts), batch_size=batch_size)
+    with instrumentation.timed("similarity", scores.size):
+        # resumes x skills, so each role's mean runs along the contiguous axis like np.mean on one pair
+        similarities = np.ascontiguousarray(cosine_similarity(resume_embeddings, skill_embeddings))
+        for j, rows in enumerate(role_rows):
+            if rows:
+                scores[:, j] = np.round(similarities[:, rows].mean(axis=1) * 100, 2)
+    return scores
+
+def batch_semantic_similarity(resume_texts, roles_skills, batch_size=256, role_embeddings=None):
+    """semantic_score_matrix as a list of rows, one per resume with one score per role."""
+    return list(semantic_score_matrix(resume_texts, roles_skills, batch_size, role_embeddings))
+
+def combine_score_matrix(hard, semantic):
+    """Vectorized combine_scores for a hard-match matrix and a float32 semantic matrix."""
+    return np.round((0.5 * hard).astype(semantic.dtype) + semantic.dtype.type(0.5) * semantic, 2)
 
 # -----------------------------
 # Assign verdict based on score
 # -----------------------------
+HIGH_VERDICT_SCORE = 70
+MEDIUM_VERDICT_SCORE = 40
+
 def assign_verdict(score):
-    if score >= 70:
+    if score >= HIGH_VERDICT_SCORE:
         return "High"
-    elif score >= 40:
+    elif score >= MEDIUM_VERDICT_SCORE:
         return "Medium"
     else:
         return "Low"
 
+def assign_verdicts(scores):
+    """Vectorized assign_verdict for an array of scores."""
+    with instrumentation.timed("verdict", np.size(scores)):
+        return np.select(
+            [scores >= HIGH_VERDICT_SCORE, scores >= MEDIUM_VERDICT_SCORE], ["High", "Medium"], "Low"
+        )
+
 # -----------------------------
 # Main pipeline
 # -----------------------------
-def match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS"):
-    resumes = parse_resumes(resume_folder)  # {filename: text}
-    jd_roles = parse_all_jds(jd_folder)     # list of roles per JD file
+def match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS", batched=True, batch_size=256, workers=1,
+                         incremental=False, manifest_path=MANIFEST_FILE):
+    """Score every resume against every JD role.
+
+    By default (batched=True) all embeddings are computed up front in large
+    encode batches and every pair is scored with matrix operations (see
+    score_batch); batched=False scores one pair at a time.
+    workers > 1 extracts resume and JD documents on a process pool.
+    With incremental=True only pairs whose resume or role changed since the
+    last run (or whose SCORER_VERSION differs) are rescored; the rest come
+    from the manifest at manifest_path.
+    """
+    resumes = parse_resumes(resume_folder, workers=workers)  # {filename: text}
+    jd_roles = parse_all_jds(jd_folder, workers=workers)     # list of roles per JD file
+
+    if incremental:
+        return _match_incremental(resumes, jd_roles, batch_size, manifest_path)
+    if batched:
+        return _match_batched(resumes, jd_roles, batch_size)
 
     results = {}
 
@@ -78,7 +190,7 @@ def match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS"):
                 verdict = assign_verdict(score)
 
                 # Identify missing skills
-                missing_skills = [s for s in jd_skills if s.lower() not in resume_text.lower()]
+                missing_skills = hard_match_details(resume_text, jd_skills)[1]
 
                 resume_matches.append({
                     "jd_file": jd_file,
@@ -92,18 +204,273 @@ def match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS"):
 
     return results
 
+def score_batch(resume_texts, roles, batch_size=256, role_embeddings=None):
+    """Score resumes against roles with batched embeddings and skill bit vectors.
+
+    Hard match, semantic score, weighted score and verdict for every pair come
+    from whole-matrix operations; only the per-pair output dicts are built in
+    Python. Returns one row per resume of {"score", "verdict",
+    "missing_skills"} per role.
+    """
+    if not len(resume_texts):
+        return []
+    roles_skills = [role.get("skills", []) for role in roles]
+    semantic = semantic_score_matrix(resume_texts, roles_skills, batch_size, role_embeddings)
+
+    with instrumentation.timed("hard_match", semantic.size):
+        layout = RoleSkillLayout(roles_skills)
+        present = layout.present_slots(resume_texts)  # resumes x role skill slots
+        hard = layout.hard_match_scores(present)
+    scores = combine_score_matrix(hard, semantic)
+    verdicts = assign_verdicts(scores).tolist()
+
+    rows = []
+    for i in range(len(resume_texts)):
+        rows.append([
+            {"score": scores[i, j], "verdict": verdicts[i][j], "missing_skills": layout.missing_skills(present[i], j)}
+            for j in range(len(roles))
+        ])
+    return rows
+
+def flatten_roles(jd_roles):
+    """[(jd_file, role)] from {jd_file: [role, ...]}, in order."""
+    return [(jd_file, role) for jd_file, roles in jd_roles.items() for role in roles]
+
+def match_entry(jd_file, role, scored):
+    """Match record for one scored (resume, role) pair, without the resume_file key."""
+    return {
+        "jd_file": jd_file,
+        "role_title": role.get("role_title", "Unknown Role"),
+        "score": scored["score"],
+        "verdict": scored["verdict"],
+        "missing_skills": scored["missing_skills"]
+    }
+
+def _match_batched(resumes, jd_roles, batch_size):
+    flat_roles = flatten_roles(jd_roles)
+    resume_files = list(resumes)
+    rows = score_batch([resumes[f] for f in resume_files], [role for _, role in flat_roles], batch_size)
+
+    results = {}
+    for resume_file, row in zip(resume_files, rows):
+        results[resume_file] = [match_entry(jd_file, role, scored) for (jd_file, role), scored in zip(flat_roles, row)]
+    return results
+
+def match_with_manifest(resumes, jd_roles, manifest, batch_size=256):
+    """Match {resume_file: text} against {jd_file: roles}, scoring only pairs the manifest has not seen.
+
+    Pairs are keyed by resume text hash and role hash, so renamed or re-uploaded
+    files are never rescored. Fresh results are saved to the manifest.
+    Returns (results, rescored): results as from match_resumes_to_jds and the
+    resume files that needed scoring.
+    """
+    flat_roles = flatten_roles(jd_roles)
+    resume_hashes = {f: text_hash(text) for f, text in resumes.items()}
+    role_hashes = [role_hash(role) for _, role in flat_roles]
+    known = manifest.get_results(resume_hashes.values())
+
+    # Rescore only resumes with at least one unseen pair, against the roles they are missing
+    stale_resumes = {}
+    stale_roles = {}
+    for resume_file, r_hash in resume_hashes.items():
+        for role_index, j_hash in enumerate(role_hashes):
+            if (r_hash, j_hash) not in known:
+                stale_resumes.setdefault(r_hash, resume_file)
+                stale_roles.setdefault(j_hash, role_index)
+
+    if stale_resumes:
+        stale_resume_files = list(stale_resumes.values())
+        stale_role_indexes = list(stale_roles.values())
+        rows = score_batch(
+            [resumes[f] for f in stale_resume_files],
+            [flat_roles[i][1] for i in stale_role_indexes],
+            batch_size
+        )
+        fresh = {}
+        for resume_file, row in zip(stale_resume_files, rows):
+            for role_index, scored in zip(stale_role_indexes, row):
+                fresh[(resume_hashes[resume_file], role_hashes[role_index])] = scored
+        manifest.save_results(fresh)
+        known.update(fresh)
+
+    results = {}
+    for resume_file, r_hash in resume_hashes.items():
+        results[resume_file] = [
+            match_entry(jd_file, role, known[(r_hash, j_hash)])
+            for (jd_file, role), j_hash in zip(flat_roles, role_hashes)
+        ]
+    return results, list(stale_resumes.values())
+
+def _match_incremental(resumes, jd_roles, batch_size, manifest_path):
+    manifest = ScoreManifest(SCORER_VERSION, manifest_path)
+    results, rescored = match_with_manifest(resumes, jd_roles, manifest, batch_size)
+
+    resume_hashes = {f: text_hash(text) for f, text in resumes.items()}
+    role_keys = {f"{jd_file}#{i}": role_hash(role) for i, (jd_file, role) in enumerate(flatten_roles(jd_roles))}
+    manifest.record_inputs(resume_hashes, role_keys)
+    manifest.close()
+    print(f"Incremental run: rescored {len(rescored)} of {len(resume_hashes)} resumes")
+    return results
+
+# -----------------------------
+# Semantic retrieval
+# -----------------------------
+def index_resumes(index, resumes, batch_size=256):
+    """Embed {resume_file: text} and add the vectors to a vector_index.VectorIndex."""
+    resume_files = list(resumes)
+    if resume_files:
+        index.add(resume_files, get_model().encode([resumes[f] for f in resume_files], batch_size=batch_size))
+
+def role_query_vector(role, use_text=False):
+    """Query vector for a role.
+
+    By default this is the mean of the role's unit skill embeddings, so its
+    dot product with a unit resume embedding is the semantic score / 100 (up to float rounding).
+    With use_text=True (or no skills) the role text embedding is used instead.
+    """
+    jd_skills = role.get("skills", [])
+    if use_text or not jd_skills:
+        return normalize(get_model().encode([role.get("text", "")]))[0]
+    return normalize(get_model().encode(jd_skills)).mean(axis=0)
+
+def semantic_top_k(index, role, k=50, nprobe=None, use_text=False):
+    """Top-k (resume_file, semantic score) for a role from a VectorIndex, best first."""
+    hits = index.search(role_query_vector(role, use_text), k=k, nprobe=nprobe)
+    return [(resume_file, round(score * 100, 2)) for resume_file, score in hits]
+
+def build_embedding_store(resume_folder="resumes", path=None, dtype="int8", chunk_size=256, batch_size=256):
+    """Embed every resume in resume_folder into an embedding_store, chunk by chunk.
+
+    Only one chunk of texts and float32 vectors is held at a time. Returns
+    the store metadata, including its measured accuracy against float32.
+    """
+    from embedding_store import EmbeddingStoreWriter, STORE_DIR
+    resume_files = get_all_resumes(resume_folder)
+    writer = EmbeddingStoreWriter(path or STORE_DIR, dtype, MODEL_NAME)
+    for start in range(0, len(resume_files), chunk_size):
+        documents = extract_documents(resume_files[start:start + chunk_size])
+        for resume_file, _, error in documents:
+            if error:
+                print(f"Error reading {resume_file}: {error}")
+        readable = [(f, text) for f, text, error in documents if not error]
+        if readable:
+            writer.add([f for f, _ in readable], get_model().encode([t for _, t in readable], batch_size=batch_size))
+    return writer.close()
+
+# -----------------------------
+# Streaming pipeline
+# -----------------------------
+def iter_matches(resume_folder="resumes", jd_folder="JDS", chunk_size=64, batch_size=256, workers=1,
+                 skill_index=None, memory_budget=None):
+    """Yield one match record per resume x role as soon as it is scored.
+
+    Resumes are read, embedded and scored chunk_size at a time, and each
+    chunk's texts are dropped before the next is read, so memory is bounded
+    by the chunk size rather than the corpus. JD skills are embedded once up
+    front. Records are dicts with resume_file, jd_file, role_title, score,
+    verdict and missing_skills. If a skill_index.SkillIndex is given, each
+    chunk of resumes is added to it as it is read. With a started
+    memory_budget.MemoryBudget, chunk and encoder batch sizes come from the
+    budget and are retuned after every chunk.
+    """
+    flat_roles = flatten_roles(parse_all_jds(jd_folder, workers=workers))
+    roles = [role for _, role in flat_roles]
+    role_embeddings = embed_role_skills([role.get("skills", []) for role in roles], batch_size)
+    resume_files = get_all_resumes(resume_folder)
+    stage = memory_budget.tracker.stage if memory_budget is not None else _no_stage
+
+    start = 0
+    while start < len(resume_files):
+        if memory_budget is not None:
+            chunk_size, batch_size = memory_budget.sizes()
+        chunk_files = resume_files[start:start + chunk_size]
+        start += len(chunk_files)
+        with memory_budget.chunk(len(chunk_files)) if memory_budget is not None else _no_stage("chunk"):
+            with stage("extract"):
+                chunk = extract_documents(chunk_files, workers)
+            for resume_file, _, error in chunk:
+                if error:
+                    print(f"Error reading {resume_file}: {error}")
+            if skill_index is not None:
+                with stage("index"):
+                    skill_index.add_resumes({f: text for f, text, error in chunk if not error})
+            with stage("score"):
+                rows = score_batch([text for _, text, _ in chunk], roles, batch_size, role_embeddings)
+            records = [
+                {"resume_file": resume_file, **match_entry(jd_file, role, scored)}
+                for (resume_file, _, _), row in zip(chunk, rows)
+                for (jd_file, role), scored in zip(flat_roles, row)
+            ]
+            del chunk, rows
+        # Yielded after the chunk is measured, so the consumer's time and memory stay out of it
+        yield from records
+
+@contextmanager
+def _no_stage(name):
+    yield None
+
+def write_jsonl(records, path):
+    """Append match records to a JSON Lines file as they arrive; returns the count written."""
+    count = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=float) + "\n")  # scores may be numpy floats
+            f.flush()
+            count += 1
+    return count
+
 # -----------------------------
 # Run pipeline
 # -----------------------------
+METRICS_JSON = "pipeline_metrics.json"
+METRICS_PROM = "pipeline_metrics.prom"
+
+def print_match(match):
+    print(f"JD File: {match['jd_file']}")
+    print(f"Role: {match['role_title']}")
+    print(f"Score: {match['score']}%")
+    print(f"Verdict: {match['verdict']}")
+    print(f"Missing Skills: {match['missing_skills']}")
+    print("---------------------------")
+
 if __name__ == "__main__":
-    results = match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS")
-
-    for resume, matches in results.items():
-        print(f"\n===== Resume: {resume} =====")
-        for match in matches:
-            print(f"JD File: {match['jd_file']}")
-            print(f"Role: {match['role_title']}")
-            print(f"Score: {match['score']}%")
-            print(f"Verdict: {match['verdict']}")
-            print(f"Missing Skills: {match['missing_skills']}")
-            print("---------------------------")
+    import argparse
+    parser = argparse.ArgumentParser(description="Match resumes/ against JDS/")
+    parser.add_argument("--metrics", action="store_true",
+                        help="print a per-stage summary and write JSON / Prometheus snapshots")
+    parser.add_argument("--max-memory", help="memory budget such as 4G; streams resumes in autotuned chunks")
+    args = parser.parse_args()
+    if args.metrics:
+        instrumentation.enable()
+
+    budget = None
+    if args.max_memory:
+        from memory_budget import MemoryBudget, parse_memory_size
+        budget = MemoryBudget(parse_memory_size(args.max_memory)).start()
+        # Printed as they stream in (records of one resume arrive together), so
+        # memory stays within the budget however large the corpus
+        current = None
+        for record in iter_matches(resume_folder="resumes", jd_folder="JDS", memory_budget=budget):
+            resume = record.pop("resume_file")
+            if resume != current:
+                print(f"\n===== Resume: {resume} =====")
+                current = resume
+            print_match(record)
+        budget.stop()
+    else:
+        results = match_resumes_to_jds(resume_folder="resumes", jd_folder="JDS")
+        for resume, matches in results.items():
+            print(f"\n===== Resume: {resume} =====")
+            for match in matches:
+                print_match(match)
+
+    if instrumentation.is_enabled():
+        print("\n===== Pipeline metrics =====")
+        print(instrumentation.summary_table())
+        instrumentation.write_json(METRICS_JSON)
+        instrumentation.write_prometheus(METRICS_PROM)
+        print(f"Metrics written to {METRICS_JSON} and {METRICS_PROM}")
+
+    if budget is not None:
+        print("\n===== Memory =====")
+        print(budget.report())
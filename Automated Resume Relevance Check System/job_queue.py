@@ -0,0 +1,394 @@
+# job_queue.py
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from document_cache import get_raw_text
+from parse_jds import parse_jd_text
+from integrated_pipeline import match_with_manifest, SCORER_VERSION
+from score_manifest import ScoreManifest, UPLOAD_MANIFEST_FILE
+from db_utils import save_results_many
+
+JOBS_FILE = "jobs.db"         # SQLite file holding jobs, their items and results
+UPLOAD_DIR = ".job_uploads"   # uploaded files, stored by content hash
+CHUNK_SIZE = 8                # resumes scored together before progress is reported
+POLL_INTERVAL = 2.0           # seconds an idle worker waits before checking for new jobs
+LEASE_SECONDS = 60.0          # a running job whose owner has not renewed its lease for this long is reclaimed
+
+# -----------------------------
+# Upload storage
+# -----------------------------
+def store_upload(data, filename, upload_dir=UPLOAD_DIR):
+    """Write uploaded bytes to upload_dir under their sha256 and return the path."""
+    ext = os.path.splitext(filename)[1].lower()
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(upload_dir, f"{digest}{ext}")
+    if not os.path.exists(path):
+        os.makedirs(upload_dir, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+# -----------------------------
+# Job table
+# -----------------------------
+class JobStore:
+    """SQLite record of analysis jobs: one row per job, one item per resume.
+
+    Every state change is committed immediately, so progress and partial
+    results are visible to any process reading the file and a job can pick
+    up where it stopped after a restart. A running job belongs to the runner
+    named in its owner column for as long as that runner renews its lease;
+    other processes sharing the file leave it alone until the lease expires.
+    """
+
+    def __init__(self, path=JOBS_FILE):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                jd_name TEXT,
+                jd_path TEXT,
+                location TEXT,
+                total INTEGER,
+                completed INTEGER DEFAULT 0,
+                error TEXT,
+                created_at REAL,
+                updated_at REAL,
+                owner TEXT,
+                lease_expires REAL
+            )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_expires", "REAL")):
+                if column not in columns:  # job files created before leases existed
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT,
+                item_index INTEGER,
+                resume_name TEXT,
+                resume_path TEXT,
+                status TEXT,
+                error TEXT,
+                PRIMARY KEY (job_id, item_index)
+            ) WITHOUT ROWID
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_results (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                resume_name TEXT,
+                role_title TEXT,
+                score REAL,
+                verdict TEXT,
+                missing_skills TEXT
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_results_job ON job_results (job_id, seq)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation, committed on success, so any thread can call in
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, jd_name, jd_path, resumes, location="Unknown"):
+        """Queue a job for a stored JD and [(resume_name, resume_path)]; returns the job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, jd_name, jd_path, location, total, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, jd_name, jd_path, location, len(resumes), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, item_index, resume_name, resume_path, status) "
+                "VALUES (?, ?, ?, ?, 'queued')",
+                [(job_id, i, name, path) for i, (name, path) in enumerate(resumes)]
+            )
+        return job_id
+
+    def claim_next(self, owner, lease=LEASE_SECONDS):
+        """Atomically claim the oldest claimable job for owner and return its id (None if idle).
+
+        Claimable are queued jobs and running jobs whose lease has expired
+        (their runner stopped or died); the job's pending items carry on.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("""
+            UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, updated_at = ?
+            WHERE job_id = (
+                SELECT job_id FROM jobs
+                WHERE status = 'queued' OR (status = 'running' AND COALESCE(lease_expires, 0) < ?)
+                ORDER BY created_at LIMIT 1
+            )
+            RETURNING job_id
+            """, (owner, now + lease, now, now)).fetchone()
+        return row[0] if row else None
+
+    def renew_leases(self, owner, lease=LEASE_SECONDS):
+        """Extend the lease of every job owner is running; returns how many."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + lease, owner)
+            ).rowcount
+
+    def release(self, job_id, owner):
+        """Hand a running job back to the queue (e.g. on shutdown) if owner still holds it."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND owner = ? AND status = 'running'", (time.time(), job_id, owner)
+            )
+
+    def pending_items(self, job_id):
+        """[(item_index, resume_name, resume_path)] not yet processed."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT item_index, resume_name, resume_path FROM job_items "
+                "WHERE job_id = ? AND status = 'queued' ORDER BY item_index", (job_id,)
+            ).fetchall()
+
+    def record_items(self, job_id, results, errors, owner, lease=LEASE_SECONDS):
+        """Store finished items in one transaction and renew owner's lease.
+
+        results: {item_index: (resume_name, [match dict, ...])}; errors:
+        {item_index: message}. Items already finished are skipped. Returns
+        False, recording nothing, if owner no longer holds the job.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            held = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE job_id = ? AND owner = ? AND status = 'running'",
+                (now + lease, now, job_id, owner)
+            ).rowcount
+            if not held:
+                return False
+            finished = 0
+            for i, (name, matches) in results.items():
+                if conn.execute("UPDATE job_items SET status = 'done' WHERE job_id = ? AND item_index = ? "
+                                "AND status = 'queued'", (job_id, i)).rowcount:
+                    finished += 1
+                    conn.executemany(
+                        "INSERT INTO job_results (job_id, resume_name, role_title, score, verdict, missing_skills) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(job_id, name, m["role_title"], float(m["score"]), m["verdict"],
+                          json.dumps(m["missing_skills"])) for m in matches]
+                    )
+            for i, message in errors.items():
+                finished += conn.execute(
+                    "UPDATE job_items SET status = 'failed', error = ? WHERE job_id = ? AND item_index = ? "
+                    "AND status = 'queued'", (message, job_id, i)
+                ).rowcount
+            conn.execute("UPDATE jobs SET completed = completed + ? WHERE job_id = ?", (finished, job_id))
+        return True
+
+    def finish_job(self, job_id, status="done", error=None, owner=None):
+        """Mark a job finished; with owner given, only if that owner still holds it."""
+        query = ("UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_expires = NULL, updated_at = ? "
+                 "WHERE job_id = ?")
+        params = [status, error, time.time(), job_id]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        with self._connect() as conn:
+            conn.execute(query, params)
+
+    def get_job(self, job_id):
+        """Job row as a dict, or None."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def recent_jobs(self, limit=10):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def job_results(self, job_id, after=0):
+        """Results recorded for a job after sequence number `after`, oldest first.
+
+        Returns (rows, last_seq); pass last_seq back as after= to get only newer rows.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, resume_name, role_title, score, verdict, missing_skills FROM job_results "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        last_seq = rows[-1][0] if rows else after
+        return [
+            {"resume_name": name, "role_title": role, "score": score, "verdict": verdict,
+             "missing_skills": json.loads(missing)}
+            for _, name, role, score, verdict, missing in rows
+        ], last_seq
+
+    def item_errors(self, job_id):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT resume_name, error FROM job_items WHERE job_id = ? AND status = 'failed' ORDER BY item_index",
+                (job_id,)
+            ).fetchall()
+
+# -----------------------------
+# Worker pool
+# -----------------------------
+class JobRunner:
+    """Background threads that claim queued jobs and score them chunk by chunk.
+
+    Each chunk of resumes is scored with match_with_manifest (so resumes seen
+    before are not rescored), saved to the results database and recorded as
+    finished items, which is what drives progress reporting. Result rows are
+    keyed by job, item and role, so a chunk repeated after a crash adds no
+    duplicates. A heartbeat thread renews the leases of this runner's jobs;
+    jobs of runners that died are picked up once their lease expires.
+    """
+
+    def __init__(self, store=None, workers=2, chunk_size=CHUNK_SIZE, upload_dir=UPLOAD_DIR, lease=LEASE_SECONDS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.upload_dir = upload_dir
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads and the lease heartbeat."""
+        if self._threads:
+            return self
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, jd_name, jd_data, resumes, location="Unknown"):
+        """Store the uploaded JD bytes and [(resume_name, bytes)], queue a job and return its id."""
+        jd_path = store_upload(jd_data, jd_name, self.upload_dir)
+        stored = [(name, store_upload(data, name, self.upload_dir)) for name, data in resumes]
+        job_id = self.store.create_job(jd_name, jd_path, stored, location)
+        self._wake.set()
+        return job_id
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self.store.renew_leases(self.owner, self.lease)
+            except sqlite3.Error as e:
+                print(f"Could not renew job leases: {e}")
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            job_id = self.store.claim_next(self.owner, self.lease)
+            if job_id is None:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            self.run_job(job_id)
+
+    def run_job(self, job_id):
+        """Process every pending item of a claimed job."""
+        job = self.store.get_job(job_id)
+        manifest = None
+        try:
+            roles = parse_jd_text(get_raw_text(job["jd_path"]))
+            jd_roles = {job["jd_name"]: roles}
+            manifest = ScoreManifest(SCORER_VERSION, UPLOAD_MANIFEST_FILE)
+            items = self.store.pending_items(job_id)
+            for start in range(0, len(items), self.chunk_size):
+                if self._stop.is_set():
+                    self.store.release(job_id, self.owner)
+                    return
+                if not self._run_chunk(job, jd_roles, manifest, items[start:start + self.chunk_size]):
+                    print(f"Job {job_id} was taken over by another runner after its lease expired")
+                    return
+            self.store.finish_job(job_id, "done", owner=self.owner)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.finish_job(job_id, "failed", str(e), owner=self.owner)
+        finally:
+            if manifest is not None:
+                manifest.close()
+
+    def _run_chunk(self, job, jd_roles, manifest, items):
+        """Score and record one chunk; False if this runner no longer holds the job."""
+        texts = {}
+        names = {}
+        errors = {}
+        for item_index, resume_name, resume_path in items:
+            try:
+                texts[item_index] = get_raw_text(resume_path)
+                names[item_index] = resume_name
+            except Exception as e:
+                errors[item_index] = str(e)
+
+        results, _ = match_with_manifest(texts, jd_roles, manifest)
+        save_results_many(
+            {"resume_file": names[i], "location": job["location"],
+             "source_key": f"job:{job['job_id']}:{i}:{role_index}", **match}
+            for i, matches in results.items() for role_index, match in enumerate(matches)
+        )
+        return self.store.record_items(
+            job["job_id"], {i: (names[i], matches) for i, matches in results.items()}, errors, self.owner, self.lease
+        )
+
+# ------------------ Quick Test ------------------
+if __name__ == "__main__":
+    import sys
+    from db_utils import init_db
+
+    if len(sys.argv) < 3:
+        print("Usage: python job_queue.py JD_FILE RESUME_FILE [RESUME_FILE ...]")
+        sys.exit(1)
+    init_db()
+    runner = JobRunner(workers=1).start()
+    with open(sys.argv[1], "rb") as f:
+        jd_data = f.read()
+    resumes = []
+    for path in sys.argv[2:]:
+        with open(path, "rb") as f:
+            resumes.append((os.path.basename(path), f.read()))
+    job_id = runner.submit(os.path.basename(sys.argv[1]), jd_data, resumes)
+    while True:
+        job = runner.store.get_job(job_id)
+        print(f"{job['status']}: {job['completed']}/{job['total']}")
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(1)
+    runner.stop()
@@ -0,0 +1,253 @@
+# memory_budget.py
+import os
+import re
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import psutil  # optional, more accurate RSS on every platform
+except ImportError:
+    psutil = None
+
+# -----------------------------
+# Helpers
+# -----------------------------
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+def parse_memory_size(text):
+    """Bytes from a size such as "4G", "512MB", "1.5GiB" or "1048576"."""
+    match = _SIZE_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid memory size: {text!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+def format_bytes(n):
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def current_rss():
+    """Resident set size of this process in bytes (None if it cannot be read)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def peak_rss():
+    """Lifetime peak RSS of this process in bytes (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024  # kilobytes on Linux
+
+# -----------------------------
+# Tracking
+# -----------------------------
+class StageMemory:
+    """High-water marks of one stage: traced Python allocations and sampled RSS."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.traced_peak = 0
+        self.rss_start = None
+        self.rss_peak = 0
+
+class MemoryTracker:
+    """Per-stage memory high-water marks.
+
+    A background thread samples RSS every `interval` seconds and credits it to
+    every open stage; with trace=True, tracemalloc peaks are recorded per
+    stage as well (this slows allocation-heavy code down noticeably).
+    Stages may nest.
+    """
+
+    def __init__(self, interval=0.05, trace=True):
+        self.interval = interval
+        self.trace = trace
+        self.stages = {}
+        self.rss_peak = current_rss() or 0
+        self._open = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            self.rss_peak = max(self.rss_peak, rss)
+            for window in self._open:
+                window.rss_peak = max(window.rss_peak, rss)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _traced_peak(self):
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+    @contextmanager
+    def stage(self, name):
+        """Track one call of a stage; yields a StageMemory with this call's peaks."""
+        window = StageMemory(name)
+        with self._lock:
+            # Credit the allocation peak so far to the enclosing stages before resetting it
+            traced = self._traced_peak()
+            for outer in self._open:
+                outer.traced_peak = max(outer.traced_peak, traced)
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            self._open.append(window)
+        window.rss_start = current_rss()
+        self._sample()
+        try:
+            yield window
+        finally:
+            self._sample()
+            with self._lock:
+                traced = self._traced_peak()
+                self._open.remove(window)
+                window.traced_peak = max(window.traced_peak, traced)
+                for outer in self._open:
+                    outer.traced_peak = max(outer.traced_peak, traced)
+                stats = self.stages.setdefault(name, StageMemory(name))
+                stats.calls += 1
+                stats.traced_peak = max(stats.traced_peak, window.traced_peak)
+                stats.rss_peak = max(stats.rss_peak, window.rss_peak)
+
+    def merge(self, windows):
+        """Fold {stage: StageMemory} measured elsewhere (e.g. in a worker process) into the totals."""
+        with self._lock:
+            for name, window in windows.items():
+                stats = self.stages.setdefault(name, StageMemory(name))
+                stats.calls += 1
+                stats.traced_peak = max(stats.traced_peak, window.traced_peak)
+                stats.rss_peak = max(stats.rss_peak, window.rss_peak)
+                self.rss_peak = max(self.rss_peak, window.rss_peak)
+
+    def snapshot(self):
+        return {
+            "rss_peak": max(self.rss_peak, peak_rss() or 0),
+            "stages": {
+                name: {"calls": s.calls, "traced_peak": s.traced_peak, "rss_peak": s.rss_peak}
+                for name, s in self.stages.items()
+            }
+        }
+
+    def report(self):
+        """End-of-run table of memory high-water marks per stage."""
+        snap = self.snapshot()
+        lines = [f"{'Stage':<16}{'Calls':>8}{'Peak RSS':>14}{'Peak traced':>14}"]
+        for name, s in snap["stages"].items():
+            traced = format_bytes(s["traced_peak"]) if self.trace else "off"
+            lines.append(f"{name:<16}{s['calls']:>8}{format_bytes(s['rss_peak']):>14}{traced:>14}")
+        lines.append(f"Process peak RSS: {format_bytes(snap['rss_peak'])}")
+        return "\n".join(lines)
+
+# -----------------------------
+# Budget
+# -----------------------------
+class MemoryBudget:
+    """Chooses resume chunk size and encoder batch size to keep RSS under max_bytes.
+
+    After every chunk, observe() gets the RSS at the chunk's start and its
+    peak. The growth gives an estimate of bytes per resume, from which the
+    next chunk is sized to fit headroom * max_bytes (changing by at most 2x
+    per step). Crossing the limit halves both sizes; plenty of room lets
+    the encoder batch grow again.
+    """
+
+    def __init__(self, max_bytes, chunk_size=64, batch_size=256, headroom=0.85, min_chunk=4, max_chunk=4096,
+                 min_batch=8, max_batch=512, tracker=None):
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.headroom = headroom
+        self.min_chunk, self.max_chunk = min_chunk, max_chunk
+        self.min_batch, self.max_batch = min_batch, max_batch
+        self.tracker = tracker or MemoryTracker()
+        self.baseline = None
+        self.bytes_per_item = None
+        self.adjustments = 0
+
+    def start(self):
+        self.tracker.start()
+        self.baseline = current_rss() or 0
+        if self.baseline >= self.max_bytes * self.headroom:
+            print(f"Warning: process already uses {format_bytes(self.baseline)} of the "
+                  f"{format_bytes(self.max_bytes)} budget; running with minimum chunk and batch sizes")
+            self.chunk_size, self.batch_size = self.min_chunk, self.min_batch
+        return self
+
+    def stop(self):
+        self.tracker.stop()
+
+    def sizes(self):
+        """(chunk_size, batch_size) for the next chunk."""
+        return self.chunk_size, self.batch_size
+
+    def observe(self, items, chunk_rss_peak, chunk_rss_start=None):
+        """Adapt sizes after a chunk of `items` resumes that peaked at chunk_rss_peak bytes."""
+        if not items or not chunk_rss_peak:
+            return
+        limit = self.max_bytes * self.headroom
+        base = self.baseline if chunk_rss_start is None else chunk_rss_start
+        per_item = max(chunk_rss_peak - base, 1) / items
+        self.bytes_per_item = per_item if self.bytes_per_item is None else max(per_item, 0.5 * self.bytes_per_item)
+        old = (self.chunk_size, self.batch_size)
+
+        if chunk_rss_peak > limit:
+            self.chunk_size = max(self.min_chunk, self.chunk_size // 2)
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+        else:
+            target = int(max(limit - base, 0) / self.bytes_per_item)
+            target = min(max(target, self.chunk_size // 2), self.chunk_size * 2)
+            self.chunk_size = min(max(target, self.min_chunk), self.max_chunk)
+            if chunk_rss_peak < 0.6 * limit:
+                self.batch_size = min(self.max_batch, self.batch_size * 2)
+        if (self.chunk_size, self.batch_size) != old:
+            self.adjustments += 1
+
+    @contextmanager
+    def chunk(self, items):
+        """Track one chunk of `items` resumes and adapt the sizes when it ends."""
+        with self.tracker.stage("chunk") as window:
+            yield window
+        self.observe(items, window.rss_peak, window.rss_start)
+
+    def report(self):
+        return (f"{self.tracker.report()}\n"
+                f"Memory budget {format_bytes(self.max_bytes)}: final chunk size {self.chunk_size}, "
+                f"encoder batch size {self.batch_size}, {self.adjustments} adjustment(s)")
@@ -1,47 +1,76 @@
 import glob
-import fitz  # PyMuPDF
-import docx2txt
 import os
+from concurrent.futures import ProcessPoolExecutor
+from document_cache import get_raw_text
 
 def extract_pdf_text(pdf_file):
-    """Extract text from a PDF file using PyMuPDF."""
+    """Extract text from a PDF file using PyMuPDF (cached by file content)."""
     text = ""
     try:
-        doc = fitz.open(pdf_file)
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+        text = get_raw_text(pdf_file)
     except Exception as e:
         print(f"Error reading {pdf_file}: {e}")
     return text
 
 def extract_docx_text(docx_file):
-    """Extract text from a DOCX file using docx2txt."""
+    """Extract text from a DOCX file using docx2txt (cached by file content)."""
     try:
-        return docx2txt.process(docx_file)
+        return get_raw_text(docx_file)
     except Exception as e:
         print(f"Error reading {docx_file}: {e}")
         return ""
 
+def extract_file_text(file_path):
+    """Extract text from a PDF, DOCX or TXT file, raising on failure."""
+    return get_raw_text(file_path)
+
+def _extract_one(file_path):
+    """Pool task: (file, text, error) with errors returned instead of raised."""
+    try:
+        return file_path, extract_file_text(file_path), None
+    except Exception as e:
+        return file_path, "", f"{type(e).__name__}: {e}"
+
+def extract_documents(files, workers=1, chunksize=1):
+    """Extract text from many files, optionally across a process pool.
+
+    workers=1 runs in-process, workers=None uses every core. Returns a list of
+    (file, text, error) tuples in the same order as files; error is None on
+    success.
+    """
+    files = list(files)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            return list(pool.map(_extract_one, files, chunksize=max(1, chunksize)))
+    return [_extract_one(f) for f in files]
+
 def get_all_resumes(folder="."):
-    """Get all PDF and DOCX files in the folder."""
+    """Get all PDF and DOCX files in the folder, in sorted order."""
     pdf_files = glob.glob(os.path.join(folder, "*.pdf"))
     docx_files = glob.glob(os.path.join(folder, "*.docx"))
-    return pdf_files + docx_files
+    return sorted(pdf_files + docx_files)
+
+def parse_resumes(folder=".", workers=1, chunksize=1, return_errors=False):
+    """Parse all resumes and return a dictionary {filename: text}.
 
-def parse_resumes(folder="."):
-    """Parse all resumes and return a dictionary {filename: text}."""
+    workers > 1 (or None for all cores) spreads extraction across a process
+    pool, handing each worker chunksize files at a time. With
+    return_errors=True a second dictionary {filename: error message} is
+    returned for the files that could not be read.
+    """
     resumes = get_all_resumes(folder)
     parsed_data = {}
-    for resume_file in resumes:
-        if resume_file.lower().endswith(".pdf"):
-            text = extract_pdf_text(resume_file)
-        elif resume_file.lower().endswith(".docx"):
-            text = extract_docx_text(resume_file)
-        else:
-            continue
+    errors = {}
+    for resume_file, text, error in extract_documents(resumes, workers, chunksize):
+        if error:
+            errors[resume_file] = error
+            print(f"Error reading {resume_file}: {error}")
         parsed_data[resume_file] = text
         print(f"Parsed {resume_file}: {len(text)} characters")
+    if return_errors:
+        return parsed_data, errors
     return parsed_data
 
 if __name__ == "__main__":
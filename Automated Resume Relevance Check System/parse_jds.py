@@ -1,10 +1,10 @@
 import re
 import os
-import spacy
-from parse_files import extract_pdf_text, extract_docx_text
+from parse_files import extract_pdf_text, extract_docx_text, extract_documents
+import instrumentation
 
-# Load small English NLP model
-nlp = spacy.load("en_core_web_sm")
+# The spaCy model is not needed for parsing; it is available lazily as
+# resources.get("spacy_en") for code that does use it.
 
 # ------------------ Functions ------------------
 
@@ -47,7 +47,7 @@ def get_skills(section_text):
     for line in section_text.split("\n"):
         if line.startswith("•") and any(k.lower() in line.lower() for k in keywords):
             skills.append(line.strip("• ").strip())
-    return list(set(skills))  # remove duplicates
+    return list(dict.fromkeys(skills))  # remove duplicates, keeping first-seen order
 
 def get_qualifications(section_text):
     """Extract degrees/qualifications"""
@@ -56,34 +56,48 @@ def get_qualifications(section_text):
 
 def parse_jd_file(jd_file):
     """Parse a JD file and return list of roles with role_title, skills, qualifications, and text"""
-    jd_text = get_jd_text(jd_file)
-    sections = split_roles(jd_text)
-    parsed_roles = []
-
-    # If no sections found, treat whole JD as single section
-    if not sections:
-        sections = [jd_text]
-
-    for sec in sections:
-        parsed_roles.append({
-            "role_title": get_role_title(sec),
-            "skills": get_skills(sec),
-            "qualifications": get_qualifications(sec),
-            "text": sec
-        })
+    return parse_jd_text(get_jd_text(jd_file))
+
+def parse_jd_text(jd_text):
+    """Split already extracted JD text into parsed roles"""
+    with instrumentation.timed("jd_parse"):
+        sections = split_roles(jd_text)
+        parsed_roles = []
+
+        # If no sections found, treat whole JD as single section
+        if not sections:
+            sections = [jd_text]
+
+        for sec in sections:
+            parsed_roles.append({
+                "role_title": get_role_title(sec),
+                "skills": get_skills(sec),
+                "qualifications": get_qualifications(sec),
+                "text": sec
+            })
     return parsed_roles
 
-def parse_all_jds(folder="JDS"):
-    """Parse all JD files in a folder and return a dictionary: {filename: parsed_roles}"""
+def parse_all_jds(folder="JDS", workers=1, chunksize=1, return_errors=False):
+    """Parse all JD files in a folder and return a dictionary: {filename: parsed_roles}
+
+    workers/chunksize enable parallel text extraction as in
+    parse_files.parse_resumes; return_errors=True also returns {filename: error}.
+    """
     all_jds = {}
+    errors = {}
     if not os.path.exists(folder):
         print(f"Folder '{folder}' does not exist!")
-        return all_jds
+        return (all_jds, errors) if return_errors else all_jds
 
-    files = [f for f in os.listdir(folder) if f.lower().endswith((".txt", ".pdf", ".docx"))]
-    for f in files:
-        path = os.path.join(folder, f)
-        all_jds[f] = parse_jd_file(path)
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith((".txt", ".pdf", ".docx")))
+    paths = [os.path.join(folder, f) for f in files]
+    for f, (path, jd_text, error) in zip(files, extract_documents(paths, workers, chunksize)):
+        if error:
+            errors[f] = error
+            print(f"Error reading {path}: {error}")
+        all_jds[f] = parse_jd_text(jd_text)
+    if return_errors:
+        return all_jds, errors
     return all_jds
 
 # ------------------ Quick Test ------------------
@@ -1,27 +1,22 @@
 import os
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from skill_matcher import get_matcher
+from tfidf_model import load_or_fit
+from text_normalization import normalize_document
 
-# Ensure nltk packages are downloaded
-nltk.download('punkt')
-nltk.download('stopwords')
+TFIDF_FILE = 'tfidf_relevance.pkl'  # TF-IDF model fitted on the cleaned corpus
+
+# NLTK data is loaded on first use through resources (never downloaded on import)
 
 # -----------------------
 # Utility Functions
 # -----------------------
 
 def clean_text(text):
-    """Lowercase, remove special characters, and tokenize"""
-    text = text.lower()
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-    tokens = word_tokenize(text)
-    tokens = [t for t in tokens if t not in stopwords.words('english')]
-    return ' '.join(tokens)
+    """Lowercase, remove special characters, and tokenize (memoized per document)"""
+    return normalize_document(text).clean
 
 def extract_projects(resume_text):
     """Extract projects with name + description cleanly"""
@@ -70,21 +65,28 @@ def extract_certifications(resume_text):
                 certifications.append(clean_line)
     return certifications
 
-def calculate_relevance(resume_text, jd_text, skills_list):
-    """Calculate skill match, semantic similarity, and extract projects/certifications"""
+def calculate_relevance(resume_text, jd_text, skills_list, tfidf=None):
+    """Calculate skill match, semantic similarity, and extract projects/certifications
+
+    tfidf: optional corpus-fitted tfidf_model.CorpusTfidf (fitted on cleaned
+    text); without it a vectorizer is fitted on just this pair.
+    """
     resume_clean = clean_text(resume_text)
     jd_clean = clean_text(jd_text)
 
     # Skill Matching
-    matched_skills = [skill for skill in skills_list if skill.lower() in resume_clean]
+    matched_skills, missing_skills = get_matcher(skills_list).match(resume_clean)
     skill_score = 0
     if matched_skills:
         skill_score = 100 * len(matched_skills) / len(skills_list)
 
     # Semantic similarity
-    vectorizer = TfidfVectorizer()
-    tfidf = vectorizer.fit_transform([resume_clean, jd_clean])
-    similarity = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
+    if tfidf is not None:
+        similarity = tfidf.similarity(jd_clean, resume_clean)
+    else:
+        vectorizer = TfidfVectorizer()
+        vectors = vectorizer.fit_transform([resume_clean, jd_clean])
+        similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
 
     # Projects and Certifications
     projects = extract_projects(resume_text)
@@ -93,7 +95,6 @@ def calculate_relevance(resume_text, jd_text, skills_list):
     # Suggestions
     suggestions = []
     if skill_score < 100:
-        missing_skills = [skill for skill in skills_list if skill not in matched_skills]
         suggestions.append(f"Consider learning/improving these skills: {', '.join(missing_skills)}")
     if not projects:
         suggestions.append("Add projects relevant to this JD to strengthen your profile.")
@@ -135,15 +136,23 @@ def main():
     resume_files = [os.path.join(resume_folder, f) for f in os.listdir(resume_folder) if f.endswith('.txt') and 'JD' not in f]
     print("Found Resume files:", resume_files)
 
-    # Loop through each JD and Resume
+    jd_texts = []
     for jd_file in jd_files:
         with open(jd_file, 'r', encoding='utf-8') as f:
-            jd_text = f.read()
+            jd_texts.append(f.read())
+    resume_texts = []
+    for resume_file in resume_files:
+        with open(resume_file, 'r', encoding='utf-8') as f:
+            resume_texts.append(f.read())
+
+    # Fit TF-IDF once on the cleaned corpus and reuse it for every pair
+    tfidf = load_or_fit([clean_text(t) for t in jd_texts + resume_texts], TFIDF_FILE)
+
+    # Loop through each JD and Resume
+    for jd_file, jd_text in zip(jd_files, jd_texts):
         print(f"\n--- Relevance for {os.path.basename(jd_file)} ---\n")
-        for resume_file in resume_files:
-            with open(resume_file, 'r', encoding='utf-8') as f:
-                resume_text = f.read()
-            result = calculate_relevance(resume_text, jd_text, skills_list)
+        for resume_file, resume_text in zip(resume_files, resume_texts):
+            result = calculate_relevance(resume_text, jd_text, skills_list, tfidf=tfidf)
             print(f"Resume: {os.path.basename(resume_file)}")
             print(f"Matched skills: {result['matched_skills']} ({result['skill_score']}%)")
             print(f"Semantic similarity: {result['semantic_similarity']}")
@@ -0,0 +1,93 @@
+# resources.py
+import os
+import threading
+
+# -----------------------------
+# Settings
+# -----------------------------
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Inference backend for the embedding model: torch, onnx or onnx-int8 (see embedding_backend.py)
+EMBEDDING_BACKEND = os.environ.get("RESUME_CHECK_EMBEDDING_BACKEND", "torch")
+
+# CPU threads for embedding inference (unset: the library default, usually all cores)
+EMBEDDING_THREADS = int(os.environ.get("RESUME_CHECK_EMBEDDING_THREADS") or 0) or None
+
+# Local folder for NLTK data and model weights (optional, defaults to each library's own cache)
+MODELS_DIR = os.environ.get("RESUME_CHECK_MODELS_DIR")
+
+# With RESUME_CHECK_OFFLINE=1 (or HF_HUB_OFFLINE=1) nothing is ever downloaded
+OFFLINE = os.environ.get("RESUME_CHECK_OFFLINE") == "1" or os.environ.get("HF_HUB_OFFLINE") == "1"
+
+# -----------------------------
+# Registry
+# -----------------------------
+_loaders = {}
+_resources = {}
+_lock = threading.Lock()
+
+def register(name, loader):
+    """Register a zero-argument loader; it runs the first time get(name) is called."""
+    _loaders[name] = loader
+
+def get(name):
+    """Return a resource, loading it on first use."""
+    if name not in _resources:
+        with _lock:
+            if name not in _resources:
+                _resources[name] = _loaders[name]()
+    return _resources[name]
+
+def is_loaded(name):
+    return name in _resources
+
+# -----------------------------
+# Loaders
+# -----------------------------
+def _ensure_nltk_data(path, package):
+    """Make sure an NLTK data package is available, downloading it only if allowed."""
+    import nltk
+    if MODELS_DIR and MODELS_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, MODELS_DIR)
+    try:
+        nltk.data.find(path)
+    except LookupError:
+        if OFFLINE:
+            raise
+        nltk.download(package, download_dir=MODELS_DIR, quiet=True)
+
+def _load_stopwords():
+    _ensure_nltk_data("corpora/stopwords", "stopwords")
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+def _load_word_tokenize():
+    _ensure_nltk_data("tokenizers/punkt", "punkt")
+    try:
+        _ensure_nltk_data("tokenizers/punkt_tab", "punkt_tab")  # needed by newer NLTK releases
+    except LookupError:
+        pass
+    from nltk.tokenize import word_tokenize
+    return word_tokenize
+
+def _load_embedding_model():
+    from embedding_cache import load_cached_model
+    kwargs = {"backend": EMBEDDING_BACKEND, "threads": EMBEDDING_THREADS}
+    if MODELS_DIR:
+        kwargs["cache_folder"] = MODELS_DIR
+    try:
+        # Local cache first, so a warm machine never touches the network
+        return load_cached_model(EMBEDDING_MODEL_NAME, local_files_only=True, **kwargs)
+    except OSError:
+        if OFFLINE:
+            raise
+        return load_cached_model(EMBEDDING_MODEL_NAME, **kwargs)
+
+def _load_spacy_en():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+register("stopwords", _load_stopwords)
+register("word_tokenize", _load_word_tokenize)
+register("embedding_model", _load_embedding_model)
+register("spacy_en", _load_spacy_en)
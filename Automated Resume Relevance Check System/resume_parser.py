@@ -1,17 +1,13 @@
-import fitz  # PyMuPDF
-import docx2txt
+from document_cache import get_pages, get_raw_text
 
 def extract_text(file_path):
     if file_path.endswith(".pdf"):
-        doc = fitz.open(file_path)
         text = ""
-        for page in doc:
-            page_text = page.get_text()
+        for page_text in get_pages(file_path):
             if page_text:
                 text += page_text + "\n"
         return text
     elif file_path.endswith(".docx"):
-        return docx2txt.process(file_path)
+        return get_raw_text(file_path)
     else:
         return ""
-
@@ -0,0 +1,112 @@
+# score_manifest.py
+import hashlib
+import json
+import sqlite3
+
+MANIFEST_FILE = "score_manifest.db"  # SQLite file remembering already scored inputs
+# Manifest for uploads scored by app.py and its background jobs. Kept apart from
+# MANIFEST_FILE because incremental CLI runs prune pairs outside their own inputs.
+UPLOAD_MANIFEST_FILE = "upload_manifest.db"
+BUSY_TIMEOUT_MS = 30000              # app sessions and job workers may write at the same time
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def role_hash(role):
+    """Hash of the role fields that feed into scoring.
+
+    Skills are sorted first so the hash does not depend on list order and
+    is the same in every process.
+    """
+    payload = json.dumps([role.get("role_title", "Unknown Role"), sorted(role.get("skills", []))])
+    return text_hash(payload)
+
+class ScoreManifest:
+    """Manifest of resume hashes, JD role hashes and scorer version from past runs.
+
+    Pair results are keyed by (resume hash, role hash); changing the scorer
+    version drops every stored result.
+    """
+
+    def __init__(self, scorer_version, path=MANIFEST_FILE):
+        self.scorer_version = scorer_version
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._init_db()
+
+    def _init_db(self):
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS resumes (resume_file TEXT PRIMARY KEY, resume_hash TEXT)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS roles (role_key TEXT PRIMARY KEY, role_hash TEXT)")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pair_results (
+            resume_hash TEXT,
+            role_hash TEXT,
+            score REAL,
+            verdict TEXT,
+            missing_skills TEXT,
+            PRIMARY KEY (resume_hash, role_hash)
+        )
+        """)
+        row = cursor.execute("SELECT value FROM meta WHERE key = 'scorer_version'").fetchone()
+        if row is None or row[0] != self.scorer_version:
+            cursor.execute("DELETE FROM pair_results")
+            cursor.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('scorer_version', ?)", (self.scorer_version,)
+            )
+        self.conn.commit()
+
+    def get_results(self, resume_hashes):
+        """Return {(resume_hash, role_hash): result dict} for the given resumes."""
+        results = {}
+        resume_hashes = list(set(resume_hashes))
+        cursor = self.conn.cursor()
+        for start in range(0, len(resume_hashes), 500):
+            chunk = resume_hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = cursor.execute(
+                "SELECT resume_hash, role_hash, score, verdict, missing_skills "
+                f"FROM pair_results WHERE resume_hash IN ({placeholders})", chunk
+            ).fetchall()
+            for r_hash, j_hash, score, verdict, missing in rows:
+                results[(r_hash, j_hash)] = {
+                    "score": score,
+                    "verdict": verdict,
+                    "missing_skills": json.loads(missing)
+                }
+        return results
+
+    def save_results(self, pair_results):
+        """Store {(resume_hash, role_hash): result dict}."""
+        self.conn.executemany("""
+        INSERT OR REPLACE INTO pair_results (resume_hash, role_hash, score, verdict, missing_skills)
+        VALUES (?, ?, ?, ?, ?)
+        """, [
+            (r_hash, j_hash, float(res["score"]), res["verdict"], json.dumps(res["missing_skills"]))
+            for (r_hash, j_hash), res in pair_results.items()
+        ])
+        self.conn.commit()
+
+    def record_inputs(self, resume_hashes, role_hashes, prune=True):
+        """Replace the manifest of inputs with this run's {file: hash} and {role_key: hash}.
+
+        With prune=True, pair results no longer reachable from the current
+        inputs are deleted.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM resumes")
+        cursor.execute("DELETE FROM roles")
+        cursor.executemany("INSERT INTO resumes (resume_file, resume_hash) VALUES (?, ?)", resume_hashes.items())
+        cursor.executemany("INSERT INTO roles (role_key, role_hash) VALUES (?, ?)", role_hashes.items())
+        if prune:
+            cursor.execute("""
+            DELETE FROM pair_results
+            WHERE resume_hash NOT IN (SELECT resume_hash FROM resumes)
+               OR role_hash NOT IN (SELECT role_hash FROM roles)
+            """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,281 @@
+# scoring_service.py
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import resources
+from integrated_pipeline import (
+    MODEL_NAME, get_model, hard_match_details, semantic_similarity_jd_resume,
+    semantic_score_matrix, combine_scores, assign_verdict
+)
+
+# -----------------------------
+# Settings
+# -----------------------------
+HOST = "127.0.0.1"
+PORT = 8000
+MAX_BATCH_SIZE = 32        # requests scored together at most
+BATCH_WINDOW = 0.01        # seconds to wait for more requests after the first one arrives
+REQUEST_TIMEOUT = 60       # seconds a request waits for its result
+MAX_BODY_BYTES = 10 << 20  # reject larger request bodies
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def _result(hard, semantic, missing):
+    score = combine_scores(hard, semantic)
+    return {
+        "hard_match": round(float(hard), 2),
+        "semantic": round(float(semantic), 2),  # float32 from the model; keep JSON output tidy
+        "score": round(float(score), 2),
+        "verdict": assign_verdict(score),
+        "missing_skills": missing
+    }
+
+def score_one(resume_text, skills):
+    """Score one resume against one skill list with the per-pair pipeline functions."""
+    hard, missing = hard_match_details(resume_text, skills)
+    return _result(hard, semantic_similarity_jd_resume(skills, resume_text), missing)
+
+def score_many(items):
+    """Score [(resume_text, skills)] with one encode of the distinct texts and one similarity matrix.
+
+    Results equal score_one per item up to float rounding (0.01 after
+    rounding): semantic_score_matrix is the batched form of
+    semantic_similarity_jd_resume.
+    """
+    resume_rows = {}
+    skill_rows = {}
+    for resume_text, skills in items:
+        resume_rows.setdefault(resume_text, len(resume_rows))
+        skill_rows.setdefault(tuple(skills), len(skill_rows))
+    semantic = semantic_score_matrix(list(resume_rows), [list(s) for s in skill_rows])
+
+    results = []
+    for resume_text, skills in items:
+        hard, missing = hard_match_details(resume_text, skills)
+        results.append(_result(hard, semantic[resume_rows[resume_text], skill_rows[tuple(skills)]], missing))
+    return results
+
+def warm_up():
+    """Load the model and run one request through the scoring path; returns seconds taken."""
+    start = time.perf_counter()
+    get_model()
+    score_many([("Python developer with SQL experience", ["Python", "SQL"])])
+    return time.perf_counter() - start
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    """Collect concurrent scoring requests into small batches run by one thread.
+
+    The first request of a batch waits at most `window` seconds for others
+    to join, up to max_batch_size; under load batches fill up and each
+    model call serves many requests.
+    """
+
+    def __init__(self, score_fn=score_many, max_batch_size=MAX_BATCH_SIZE, window=BATCH_WINDOW):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, resume_text, skills):
+        """Queue one request; returns a Future for its result."""
+        future = Future()
+        self._queue.put(((resume_text, skills), future))
+        return future
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # stop after this batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                results = self.score_fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+# -----------------------------
+# HTTP handler
+# -----------------------------
+def _parse_item(payload):
+    """(resume_text, skills) from a request object, raising ValueError when malformed."""
+    if not isinstance(payload, dict):
+        raise ValueError("each request must be a JSON object")
+    resume_text = payload.get("resume_text")
+    skills = payload.get("skills", payload.get("jd_skills"))
+    if not isinstance(resume_text, str):
+        raise ValueError("'resume_text' must be a string")
+    if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+        raise ValueError("'skills' must be a list of strings")
+    return resume_text, skills
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: GET /health, POST /warmup, POST /score, POST /score/batch."""
+
+    server_version = "ResumeScoring/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            batcher = self.server.batcher
+            self._send_json(200, {
+                "status": "ok",
+                "model": MODEL_NAME,
+                "model_loaded": resources.is_loaded("embedding_model"),
+                "batching": batcher is not None,
+                "queue_depth": batcher.queue_depth() if batcher else 0,
+                "batches": batcher.batches if batcher else 0,
+                "batched_requests": batcher.items if batcher else 0
+            })
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/warmup":
+            self._send_json(200, {"status": "warm", "seconds": round(warm_up(), 3)})
+            return
+        if self.path not in ("/score", "/score/batch"):
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            payload = self._read_json()
+            if self.path == "/score":
+                items = [_parse_item(payload)]
+            else:
+                if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+                    raise ValueError("'items' must be a list")
+                items = [_parse_item(item) for item in payload["items"]]
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            results = self._score(items)
+        except FutureTimeout:
+            self._send_json(503, {"error": "Timed out waiting for a scoring slot"})
+            return
+        except Exception as e:
+            print(f"Scoring failed: {e}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, results[0] if self.path == "/score" else {"results": results})
+
+    def _score(self, items):
+        batcher = self.server.batcher
+        if batcher is None:
+            return [score_one(resume_text, skills) for resume_text, skills in items]
+        # Each item joins the shared queue, so a batch request also merges with concurrent traffic
+        futures = [batcher.submit(resume_text, skills) for resume_text, skills in items]
+        deadline = time.monotonic() + REQUEST_TIMEOUT
+        return [future.result(timeout=max(0, deadline - time.monotonic())) for future in futures]
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the socketserver default of 5 resets connections at peak load
+
+def make_server(host=HOST, port=PORT, batching=True, max_batch_size=MAX_BATCH_SIZE, window=BATCH_WINDOW,
+                verbose=False):
+    """A threaded HTTP server for ScoringHandler; its batcher (if any) is already started."""
+    server = ScoringServer((host, port), ScoringHandler)
+    server.batcher = MicroBatcher(score_many, max_batch_size, window).start() if batching else None
+    server.verbose = verbose
+    return server
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Resume scoring HTTP service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--no-batching", action="store_true", help="score every request on its own")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000)
+    parser.add_argument("--warmup", action="store_true", help="load the model before accepting requests")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    if args.warmup:
+        print(f"Warmed up in {warm_up():.2f}s")
+    server = make_server(args.host, args.port, not args.no_batching, args.max_batch_size,
+                         args.batch_window_ms / 1000, args.verbose)
+    print(f"Scoring service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.batcher is not None:
+            server.batcher.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# skill_index.py
+import heapq
+import os
+import sqlite3
+import zlib
+from collections import Counter
+from document_cache import get_raw_text
+from score_manifest import text_hash
+from skill_matcher import get_matcher
+import instrumentation
+
+INDEX_FILE = "skill_index.db"  # SQLite file holding the skill -> resume postings
+BACKFILL_BATCH = 500           # stored resumes scanned for new skills per step on the query path
+
+def _load_resume_text(resume_id):
+    """Text loader for resumes indexed before texts were stored: IDs that are file paths."""
+    return get_raw_text(resume_id) if os.path.exists(resume_id) else None
+
+def _pack(text):
+    # The matcher lowercases anyway, so the lowercased text is what is kept
+    return zlib.compress(text.lower().encode("utf-8"))
+
+class SkillIndex:
+    """Inverted index from canonical skill to the resumes that mention it.
+
+    Resumes are matched against the index vocabulary when they are added,
+    and their lowercased text is stored (compressed) next to the postings.
+    Skills first seen in a query join the vocabulary and are back-filled
+    from the stored texts in batches of BACKFILL_BATCH resumes per query, so
+    no query scans the whole corpus; until a skill is complete the query
+    says so (see last_query_complete). backfill() with no limit finishes the
+    work offline, and skills passed to the constructor are back-filled fully.
+    """
+
+    def __init__(self, path=INDEX_FILE, skills=(), text_loader=_load_resume_text):
+        self.text_loader = text_loader
+        self.conn = sqlite3.connect(path)
+        self._init_db()
+        self.skill_ids = dict(self.conn.execute("SELECT skill, skill_id FROM skills"))
+        self.last_query_complete = True
+        if skills:
+            self.add_skills(skills)
+            self.backfill()
+
+    def _init_db(self):
+        cursor = self.conn.cursor()
+        # backfill_pos: rowid of the last stored resume scanned for this skill (NULL once complete)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS skills (
+            skill_id INTEGER PRIMARY KEY,
+            skill TEXT UNIQUE,
+            backfill_pos INTEGER
+        )
+        """)
+        cursor.execute("CREATE TABLE IF NOT EXISTS resumes (resume_id TEXT PRIMARY KEY, content_hash TEXT, text BLOB)")
+        # Index files from before texts and back-fill positions were stored
+        for table, column, kind in (("skills", "backfill_pos", "INTEGER"), ("resumes", "text", "BLOB")):
+            if column not in {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS postings (
+            skill_id INTEGER,
+            resume_id TEXT,
+            PRIMARY KEY (skill_id, resume_id)
+        ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_postings_resume ON postings (resume_id)")
+        self.conn.commit()
+
+    # -----------------------------
+    # Vocabulary
+    # -----------------------------
+    def add_skills(self, skills):
+        """Add skills to the vocabulary; their postings for stored resumes are filled by backfill()."""
+        new_skills = sorted({s.lower() for s in skills if s and s.lower() not in self.skill_ids})
+        if not new_skills:
+            return []
+        cursor = self.conn.cursor()
+        # Resumes added from now on are matched against the new skills directly
+        has_resumes = cursor.execute("SELECT 1 FROM resumes LIMIT 1").fetchone() is not None
+        for skill in new_skills:
+            cursor.execute("INSERT INTO skills (skill, backfill_pos) VALUES (?, ?)", (skill, 0 if has_resumes else None))
+            self.skill_ids[skill] = cursor.lastrowid
+        self.conn.commit()
+        return new_skills
+
+    def pending_skills(self):
+        """Skills whose back-fill over the stored resumes is not finished."""
+        return {skill for (skill,) in self.conn.execute("SELECT skill FROM skills WHERE backfill_pos IS NOT NULL")}
+
+    def backfill(self, max_resumes=None):
+        """Scan stored resumes for pending skills, at most max_resumes per call (None: until done).
+
+        Skills added together share a position and are scanned together.
+        Resumes with no stored text fall back to text_loader; any that still
+        cannot be read are counted and reported, since their postings stay
+        incomplete. Returns the number of skills still pending.
+        """
+        cursor = self.conn.cursor()
+        budget = max_resumes
+        skipped = []
+        while budget is None or budget > 0:
+            row = cursor.execute("SELECT MIN(backfill_pos) FROM skills WHERE backfill_pos IS NOT NULL").fetchone()
+            if row[0] is None:
+                break
+            pos = row[0]
+            group = [s for (s,) in cursor.execute("SELECT skill FROM skills WHERE backfill_pos = ?", (pos,))]
+            limit = BACKFILL_BATCH if budget is None else min(budget, BACKFILL_BATCH)
+            rows = cursor.execute(
+                "SELECT rowid, resume_id, text FROM resumes WHERE rowid > ? ORDER BY rowid LIMIT ?", (pos, limit)
+            ).fetchall()
+            matcher = get_matcher(group)
+            postings = []
+            for _, resume_id, packed in rows:
+                if packed is not None:
+                    text = zlib.decompress(packed).decode("utf-8")
+                else:
+                    text = self.text_loader(resume_id) if self.text_loader is not None else None
+                    if text is None:
+                        skipped.append(resume_id)
+                        continue
+                postings += [(self.skill_ids[s], resume_id) for s in matcher.find(text) if s]
+            cursor.executemany("INSERT OR IGNORE INTO postings (skill_id, resume_id) VALUES (?, ?)", postings)
+            # Fewer rows than asked for means the end of the table was reached
+            new_pos = rows[-1][0] if len(rows) == limit else None
+            cursor.executemany("UPDATE skills SET backfill_pos = ? WHERE skill = ?", [(new_pos, s) for s in group])
+            self.conn.commit()
+            if budget is not None:
+                budget -= len(rows)
+        if skipped:
+            instrumentation.count("skill_index.backfill_skipped", len(skipped))
+            print(f"Skill index: {len(skipped)} stored resume(s) have no text and could not be loaded "
+                  f"(e.g. {skipped[0]!r}); re-add them to index new skills for them")
+        return cursor.execute("SELECT COUNT(*) FROM skills WHERE backfill_pos IS NOT NULL").fetchone()[0]
+
+    # -----------------------------
+    # Ingestion
+    # -----------------------------
+    def add_resume(self, resume_id, text, commit=True):
+        """Index (or re-index) one resume; unchanged content is skipped."""
+        content_hash = text_hash(text)
+        cursor = self.conn.cursor()
+        row = cursor.execute(
+            "SELECT content_hash, text IS NOT NULL FROM resumes WHERE resume_id = ?", (resume_id,)
+        ).fetchone()
+        # Resumes indexed before texts were stored are rewritten once to store theirs
+        if row is not None and row[0] == content_hash and row[1]:
+            return False
+        cursor.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+        cursor.execute(
+            "INSERT OR REPLACE INTO resumes (resume_id, content_hash, text) VALUES (?, ?, ?)",
+            (resume_id, content_hash, _pack(text))
+        )
+        if self.skill_ids:
+            present = get_matcher(sorted(self.skill_ids)).find(text)
+            cursor.executemany(
+                "INSERT INTO postings (skill_id, resume_id) VALUES (?, ?)",
+                [(self.skill_ids[s], resume_id) for s in present if s]
+            )
+        if commit:
+            self.conn.commit()
+        return True
+
+    def add_resumes(self, resumes):
+        """Index a {resume_id: text} mapping in one transaction; returns how many changed."""
+        changed = sum(self.add_resume(resume_id, text, commit=False) for resume_id, text in resumes.items())
+        self.conn.commit()
+        return changed
+
+    def remove_resume(self, resume_id):
+        self.conn.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+        self.conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,))
+        self.conn.commit()
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _postings(self, skill_id):
+        rows = self.conn.execute("SELECT resume_id FROM postings WHERE skill_id = ?", (skill_id,))
+        return {resume_id for (resume_id,) in rows}
+
+    def top_candidates(self, role, k=50, backfill_budget=BACKFILL_BATCH):
+        """Top-k resumes for a parsed role (see parse_jds.parse_jd_file) by hard-match score.
+
+        Only resumes sharing at least one skill with the role are considered.
+        Returns dicts with resume_id, score, matched_skills and missing_skills,
+        best first. New skills are back-filled for at most backfill_budget
+        stored resumes; if any of the role's skills is still incomplete,
+        last_query_complete is False and resumes may be missing.
+        """
+        jd_skills = role.get("skills", [])
+        self.last_query_complete = True
+        if not jd_skills:
+            return []
+        self.add_skills(jd_skills)
+        if self.backfill(backfill_budget):
+            incomplete = self.pending_skills() & {s.lower() for s in jd_skills}
+            if incomplete:
+                self.last_query_complete = False
+                instrumentation.count("skill_index.partial_queries")
+                print(f"Skill index: back-fill of {len(incomplete)} skill(s) for "
+                      f"{role.get('role_title', 'this role')} is still in progress; results may be incomplete")
+
+        weights = Counter(s.lower() for s in jd_skills)
+        always = weights.pop("", 0)  # an empty skill is contained in every resume
+        postings = {skill: self._postings(self.skill_ids[skill]) for skill in weights}
+
+        counts = Counter()
+        for skill, resume_ids in postings.items():
+            for resume_id in resume_ids:
+                counts[resume_id] += weights[skill]
+
+        best = heapq.nsmallest(k, counts.items(), key=lambda item: (-item[1], item[0]))
+        candidates = []
+        for resume_id, matched in best:
+            matched_skills, missing_skills = [], []
+            for s in jd_skills:
+                found = not s or resume_id in postings[s.lower()]
+                (matched_skills if found else missing_skills).append(s)
+            candidates.append({
+                "resume_id": resume_id,
+                "score": round((matched + always) / len(jd_skills) * 100, 2),
+                "matched_skills": matched_skills,
+                "missing_skills": missing_skills
+            })
+        return candidates
+
+    def close(self):
+        self.conn.close()
+
+# ------------------ Quick Test ------------------
+if __name__ == "__main__":
+    from parse_files import parse_resumes
+    from parse_jds import parse_all_jds
+
+    index = SkillIndex()
+    index.add_resumes(parse_resumes("resumes"))
+    for jd_file, roles in parse_all_jds("JDS").items():
+        for role in roles:
+            print(f"====== {jd_file}: {role['role_title']} ======")
+            for candidate in index.top_candidates(role, k=10):
+                print(f"{candidate['resume_id']}: {candidate['score']}% missing {candidate['missing_skills']}")
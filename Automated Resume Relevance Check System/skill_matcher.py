@@ -0,0 +1,107 @@
+# skill_matcher.py
+import re
+from functools import lru_cache
+
+# -----------------------------
+# Trie-shaped regex
+# -----------------------------
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True  # end-of-skill marker
+    return trie
+
+def _trie_pattern(node):
+    """Regex for a trie node; optional tails are greedy so the longest skill wins."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        body = "(?:" + body + ")?"
+    return body
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+# -----------------------------
+# Matcher
+# -----------------------------
+class SkillMatcher:
+    """Finds every skill of a vocabulary in one pass over a text.
+
+    The vocabulary is compiled once into a single trie-shaped regex, so the
+    scan costs one walk over the text instead of one substring search per
+    skill. Matching is case-insensitive. By default a skill matches anywhere
+    in the text (same as `skill.lower() in text.lower()`); with
+    whole_words=True it must not touch a letter or digit on either side.
+    """
+
+    def __init__(self, skills, whole_words=False):
+        self.skills = list(skills)
+        self.whole_words = whole_words
+        vocab = sorted({s.lower() for s in self.skills if s})
+        # An empty skill is contained in every text
+        self._always = {""} if any(not s for s in self.skills) else set()
+        self._trie = _build_trie(vocab)
+
+        body = _trie_pattern(self._trie)
+        if not body:
+            self._pattern = None
+        elif whole_words:
+            self._pattern = re.compile(r"(?<!\w)(?=(" + body + r")(?!\w))")
+        else:
+            self._pattern = re.compile(r"(?=(" + body + r"))")
+
+        # The scan reports the longest skill at each position; any other skill
+        # inside it (a prefix, or a later word) is implied by that match.
+        self._implied = {word: self._contained(word) for word in vocab}
+
+    def _contained(self, word):
+        """Vocabulary skills occurring inside word, honouring whole_words."""
+        found = set()
+        for start in range(len(word)):
+            if self.whole_words and start > 0 and _is_word_char(word[start - 1]):
+                continue
+            node = self._trie
+            for end in range(start, len(word)):
+                node = node.get(word[end])
+                if node is None:
+                    break
+                if "" in node:
+                    at_boundary = end + 1 == len(word) or not _is_word_char(word[end + 1])
+                    if not self.whole_words or at_boundary:
+                        found.add(word[start:end + 1])
+        return found
+
+    def find(self, text):
+        """Return the set of lowercased vocabulary skills present in text."""
+        present = set(self._always)
+        if self._pattern is None:
+            return present
+        longest = {m.group(1) for m in self._pattern.finditer(text.lower())}
+        for word in longest:
+            present |= self._implied[word]
+        return present
+
+    def partition(self, present, skills=None):
+        """Split skills (default: the vocabulary) into (matched, missing) given a find() result."""
+        matched, missing = [], []
+        for skill in self.skills if skills is None else skills:
+            (matched if skill.lower() in present else missing).append(skill)
+        return matched, missing
+
+    def match(self, text, skills=None):
+        """Return (matched, missing) skills for text, preserving the given order."""
+        return self.partition(self.find(text), skills)
+
+@lru_cache(maxsize=256)
+def _cached_matcher(skills, whole_words):
+    return SkillMatcher(skills, whole_words)
+
+def get_matcher(skills, whole_words=False):
+    """Compiled matcher for a skill list, reused across calls with the same list."""
+    return _cached_matcher(tuple(skills), whole_words)
@@ -0,0 +1,74 @@
+# skill_vectors.py
+import numpy as np
+from skill_matcher import get_matcher
+
+# -----------------------------
+# Skill vocabulary
+# -----------------------------
+class SkillVocabulary:
+    """Maps every canonical (lowercased) skill to an integer ID."""
+
+    def __init__(self, skills=()):
+        self.ids = {}
+        self.skills = []
+        for skill in skills:
+            self.add(skill)
+
+    def add(self, skill):
+        key = skill.lower()
+        if key not in self.ids:
+            self.ids[key] = len(self.skills)
+            self.skills.append(key)
+        return self.ids[key]
+
+    def __len__(self):
+        return len(self.skills)
+
+    def skill_matrix(self, texts):
+        """Boolean matrix (texts x skills): True where the skill occurs in the text."""
+        matcher = get_matcher(self.skills)
+        matrix = np.zeros((len(texts), len(self.skills)), dtype=bool)
+        for row, text in enumerate(texts):
+            present = [self.ids[s] for s in matcher.find(text) if s in self.ids]
+            matrix[row, present] = True
+        return matrix
+
+# -----------------------------
+# Role skill layout
+# -----------------------------
+class RoleSkillLayout:
+    """Every role's skill list laid out as consecutive slots of skill IDs.
+
+    Each entry of a role's `skills` list gets one slot (duplicates included),
+    so hard-match percentages and missing-skill masks for all resumes x roles
+    come from column gathers and a cumulative sum over the slots.
+    """
+
+    def __init__(self, roles_skills, vocabulary=None):
+        self.roles_skills = [list(skills) for skills in roles_skills]
+        self.vocabulary = vocabulary if vocabulary is not None else SkillVocabulary()
+        slot_ids = [self.vocabulary.add(s) for skills in self.roles_skills for s in skills]
+        self.slot_ids = np.array(slot_ids, dtype=np.int64)
+        self.sizes = np.array([len(skills) for skills in self.roles_skills], dtype=np.int64)
+        self.ends = np.cumsum(self.sizes)
+        self.starts = self.ends - self.sizes
+
+    def present_slots(self, resume_texts):
+        """Boolean matrix (resumes x slots): True where the slot's skill is in the resume."""
+        resume_matrix = self.vocabulary.skill_matrix(resume_texts)
+        return resume_matrix[:, self.slot_ids]
+
+    def hard_match_scores(self, present):
+        """Hard-match percentage per resume x role, rounded like compute_hard_match."""
+        cumulative = np.zeros((present.shape[0], present.shape[1] + 1), dtype=np.int64)
+        np.cumsum(present, axis=1, out=cumulative[:, 1:])
+        matched = cumulative[:, self.ends] - cumulative[:, self.starts]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(self.sizes > 0, matched / np.maximum(self.sizes, 1) * 100, 0.0)
+        return np.round(scores, 2)
+
+    def missing_skills(self, present_row, role_index):
+        """Missing skills of one role for one resume row of present_slots()."""
+        start, end = self.starts[role_index], self.ends[role_index]
+        mask = present_row[start:end]
+        return [skill for skill, found in zip(self.roles_skills[role_index], mask) if not found]
@@ -1,43 +1,30 @@
 # standardize_resumes.py
-import fitz  # PyMuPDF
-import docx2txt
-import re
 import os
+from document_cache import get_raw_text, get_standardized_text
+from text_normalization import standardize_resume_text
 
 # ---------- Step 1: Functions to extract raw text ----------
+# Extraction goes through document_cache, so files already parsed by other
+# entry points are read from the cache instead of being opened again.
 
 def extract_pdf_text(pdf_file):
     text = ""
     try:
-        doc = fitz.open(pdf_file)
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+        text = get_raw_text(pdf_file)
     except Exception as e:
         print(f"Error reading {pdf_file}: {e}")
     return text
 
 def extract_docx_text(docx_file):
     try:
-        return docx2txt.process(docx_file)
+        return get_raw_text(docx_file)
     except Exception as e:
-        print(f"Error reading {pdf_file}: {e}")
+        print(f"Error reading {docx_file}: {e}")
         return ""
 
 # ---------- Step 2: Standardize the text ----------
-
-def standardize_resume_text(raw_text):
-    text = raw_text
-    text = re.sub(r'Page \d+ of \d+', '', text, flags=re.IGNORECASE)
-    lines = text.split('\n')
-    lines = [line.strip() for line in lines if len(line.strip()) > 2]
-    text = '\n'.join(lines)
-    text = re.sub(r'\s+', ' ', text)
-    text = text.replace('•', '-').replace('·', '-').replace('*', '-')
-    section_keywords = ['skills', 'education', 'experience', 'projects', 'certifications']
-    for keyword in section_keywords:
-        text = re.sub(keyword, keyword.upper(), text, flags=re.IGNORECASE)
-    return text
+# standardize_resume_text lives in text_normalization (precompiled patterns)
+# and is re-exported here.
 
 # ---------- Step 3: Process all resumes in folder ----------
 if __name__ == "__main__":
@@ -51,12 +38,11 @@ if __name__ == "__main__":
 
     for resume_file in resumes:
         file_path = os.path.join(resume_folder, resume_file)
-        if resume_file.lower().endswith(".pdf"):
-            raw_text = extract_pdf_text(file_path)
-        else:
-            raw_text = extract_docx_text(file_path)
-
-        cleaned_text = standardize_resume_text(raw_text)
+        try:
+            cleaned_text = get_standardized_text(file_path)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            cleaned_text = standardize_resume_text("")
         clean_name = os.path.splitext(resume_file)[0] + "_clean.txt"
         clean_path = os.path.join(output_folder, clean_name)
 
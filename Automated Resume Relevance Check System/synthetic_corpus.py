@@ -0,0 +1,187 @@
+# synthetic_corpus.py
+import argparse
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+import fitz  # PyMuPDF
+
+# -----------------------------
+# Vocabulary
+# -----------------------------
+SKILLS = [
+    "Python", "R", "SQL", "Spark", "Pandas", "NumPy", "Machine Learning", "Deep Learning", "NLP",
+    "Excel", "Tableau", "Power BI", "Docker", "Git", "Kubernetes", "AWS", "Azure", "GCP", "Java",
+    "JavaScript", "TypeScript", "React", "Node.js", "Django", "Flask", "FastAPI", "PostgreSQL",
+    "MongoDB", "Redis", "Kafka", "Airflow", "Hadoop", "TensorFlow", "PyTorch", "Scikit-learn",
+    "Statistics", "Data Visualization", "ETL", "Linux", "CI/CD", "REST APIs", "Microservices",
+    "C++", "Go", "Computer Vision", "MLOps", "Snowflake", "dbt", "Looker", "A/B Testing"
+]
+ROLES = [
+    "Data Analyst", "Data Scientist", "Machine Learning Engineer", "Backend Developer",
+    "Full Stack Developer", "Data Engineer", "Business Intelligence Analyst", "DevOps Engineer",
+    "NLP Engineer", "Cloud Engineer"
+]
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rahul", "Isha"]
+LAST_NAMES = ["Sharma", "Reddy", "Iyer", "Patel", "Gupta", "Nair", "Singh", "Rao", "Das", "Mehta"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Flipkart", "Swiggy", "Zomato", "Razorpay", "Freshworks", "HCL", "Accenture"]
+PROJECT_TOPICS = [
+    "customer churn prediction", "sales forecasting dashboard", "resume screening tool",
+    "real-time fraud detection", "recommendation engine", "inventory optimization",
+    "sentiment analysis of reviews", "log anomaly detection", "chatbot for support tickets",
+    "image classification service"
+]
+CERTIFICATIONS = [
+    "AWS Certified Cloud Practitioner", "Google Data Analytics Certificate", "Microsoft Certified: Azure Fundamentals",
+    "TensorFlow Developer Certificate", "Tableau Desktop Specialist", "Certified Kubernetes Application Developer",
+    "IBM Data Science Professional Certificate", "Databricks Certified Associate Developer"
+]
+DEGREES = ["B.Tech in Computer Science", "BE in Electronics", "Bachelor's in Statistics", "Master's in Data Science",
+           "PhD in Machine Learning"]
+LOCATIONS = ["Hyderabad", "Bangalore", "Pune", "Delhi NCR", "Chennai"]
+
+# -----------------------------
+# Text generators
+# -----------------------------
+def resume_text(rng):
+    """A resume with contact, summary, skills, experience, projects, certifications and education sections."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, rng.randint(5, 14))
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +91 9{rng.randint(100000000, 999999999)} | {rng.choice(LOCATIONS)}",
+        "",
+        "Summary",
+        f"{rng.choice(ROLES)} with {rng.randint(0, 12)} years of experience building data and software products "
+        f"using {', '.join(skills[:3])}.",
+        "",
+        "Skills",
+        ", ".join(skills),
+        "",
+        "Experience",
+    ]
+    for _ in range(rng.randint(1, 4)):
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2012, 2023)} - present)")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"• Delivered {rng.choice(PROJECT_TOPICS)} with {rng.choice(skills)} and "
+                         f"{rng.choice(skills)}, improving key metrics by {rng.randint(5, 60)}%.")
+    lines += ["", "Projects"]
+    for topic in rng.sample(PROJECT_TOPICS, rng.randint(1, 4)):
+        lines.append(f"• {topic.capitalize()}: built with {', '.join(rng.sample(skills, min(3, len(skills))))}.")
+    lines += ["", "Certifications"]
+    lines += [f"• {c}" for c in rng.sample(CERTIFICATIONS, rng.randint(0, 3))]
+    lines += ["", "Education", rng.choice(DEGREES), ""]
+    return "\n".join(lines)
+
+def jd_text(rng, n_roles=None):
+    """A JD file in the numbered-role layout parse_jds.split_roles expects."""
+    n_roles = n_roles or rng.randint(1, 4)
+    lines = [f"{rng.choice(COMPANIES)} is hiring in {rng.choice(LOCATIONS)}", ""]
+    for number, role in enumerate(rng.sample(ROLES, n_roles), 1):
+        skills = rng.sample(SKILLS, rng.randint(4, 10))
+        lines += [
+            f"{number}. {role}",
+            f"We are looking for a {role} to join our team.",
+            "Responsibilities",
+            f"• Own {rng.choice(PROJECT_TOPICS)} end to end.",
+            f"• Work with {rng.choice(skills)} and {rng.choice(skills)} in production.",
+            f"Skills: {', '.join(skills)}",
+            f"Eligibility: {rng.choice(DEGREES)} or equivalent",
+            ""
+        ]
+    return "\n".join(lines)
+
+# -----------------------------
+# File writers
+# -----------------------------
+def write_txt(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def write_pdf(path, text, lines_per_page=55):
+    """PDF with the text laid out line by line (insert_text does not wrap, so long lines are split)."""
+    wrapped = []
+    for line in text.split("\n"):
+        while len(line) > 95:
+            cut = line.rfind(" ", 0, 95)
+            cut = cut if cut > 0 else 95
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+    doc = fitz.open()
+    for start in range(0, len(wrapped), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 60), "\n".join(wrapped[start:start + lines_per_page]), fontsize=10)
+    doc.save(path)
+    doc.close()
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+def write_docx(path, text):
+    """Minimal DOCX (one paragraph per line) written with zipfile; no python-docx needed."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.split("\n")
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _DOCX_RELS)
+        docx.writestr("word/document.xml", document)
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+# -----------------------------
+# Corpus
+# -----------------------------
+def generate_corpus(out_dir, n_resumes, n_jds=10, resume_formats=("pdf", "docx"), jd_formats=("txt", "pdf", "docx"),
+                    seed=0):
+    """Write n_resumes resumes to out_dir/resumes and n_jds JDs to out_dir/JDS.
+
+    Formats rotate through the given lists. The same seed always gives the
+    same corpus. Returns (resume_dir, jd_dir).
+    """
+    rng = random.Random(seed)
+    resume_dir = os.path.join(out_dir, "resumes")
+    jd_dir = os.path.join(out_dir, "JDS")
+    os.makedirs(resume_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+    for i in range(n_resumes):
+        fmt = resume_formats[i % len(resume_formats)]
+        WRITERS[fmt](os.path.join(resume_dir, f"resume_{i:06d}.{fmt}"), resume_text(rng))
+    for i in range(n_jds):
+        fmt = jd_formats[i % len(jd_formats)]
+        WRITERS[fmt](os.path.join(jd_dir, f"jd_{i:04d}.{fmt}"), jd_text(rng))
+    return resume_dir, jd_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--jds", type=int, default=10)
+    parser.add_argument("--resume-formats", nargs="+", default=["pdf", "docx"], choices=sorted(WRITERS))
+    parser.add_argument("--jd-formats", nargs="+", default=["txt", "pdf", "docx"], choices=sorted(WRITERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    resume_dir, jd_dir = generate_corpus(args.out_dir, args.resumes, args.jds, args.resume_formats,
+                                         args.jd_formats, args.seed)
+    print(f"Wrote {args.resumes} resumes to {resume_dir} and {args.jds} JDs to {jd_dir}")
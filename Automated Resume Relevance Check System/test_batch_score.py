@@ -0,0 +1,88 @@
+# test_batch_score.py
+import csv
+import json
+import sqlite3
+import pytest
+import batch_score
+import db_utils
+
+ROLES = [{"role_title": "Analyst", "skills": ["SQL"]}, {"role_title": "Engineer", "skills": ["Go", "SQL"]}]
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    # Extraction and scoring are replaced by fakes; the files only need to exist
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for i in range(7):
+        (resumes / f"r{i}.pdf").write_bytes(b"")
+    (resumes / "bad.pdf").write_bytes(b"")
+    (tmp_path / "jd.txt").write_text("JD", encoding="utf-8")
+
+    def extract(files, workers=1):
+        return [(f, None, "unreadable") if f.endswith("bad.pdf") else (f, f"text of {f}", None) for f in files]
+
+    def score(texts, roles, batch_size, role_embeddings):
+        return [[{"score": len(text) % 10 * 10.0, "verdict": "Low", "missing_skills": ["go"]} for _ in roles]
+                for text in texts]
+
+    monkeypatch.setattr(batch_score, "extract_documents", extract)
+    monkeypatch.setattr(batch_score, "parse_jd_text", lambda text: ROLES)
+    monkeypatch.setattr(batch_score, "score_batch", score)
+    monkeypatch.setattr(batch_score, "embed_role_skills", lambda roles_skills, batch_size: None)
+    monkeypatch.setattr(db_utils, "DB_FILE", db_utils.DB_FILE)
+    yield tmp_path
+    db_utils.get_pool().close()
+
+def _run(tmp_path, output, *extra):
+    return batch_score.main(["--resumes", str(tmp_path / "resumes"), "--jds", str(tmp_path / "jd.txt"),
+                             "--output", str(output), "--processes", "1", "--chunk-size", "3", *extra])
+
+def _crash_after_first_chunk(output, partial):
+    """Leave output and checkpoint as a crash between writing chunk 2 and checkpointing it would."""
+    checkpoint = f"{output}.checkpoint"
+    with open(checkpoint, "r", encoding="utf-8") as f:
+        first_chunk = f.readlines()[:3]
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.writelines(first_chunk)
+    if partial:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(partial)  # a record cut off mid-write
+    return checkpoint
+
+def _jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def _csv(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+def _db(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT resume_file, jd_file, role_title, score FROM results").fetchall()
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("name, read, partial", [
+    ("out.jsonl", _jsonl, '{"resume_file": "r5'),
+    ("out.csv", _csv, "r5.pdf,jd.txt,Eng"),
+    ("out.db", _db, None),
+])
+def test_resume_from_after_a_crash_writes_each_record_once(inputs, name, read, partial):
+    output = inputs / name
+    assert _run(inputs, output) == 0
+    expected = read(output)
+    assert len(expected) == 7 * len(ROLES)  # bad.pdf produces no records
+
+    checkpoint = _crash_after_first_chunk(output, partial)
+    assert _run(inputs, output, "--resume-from", checkpoint) == 0
+    records = read(output)
+    key = (lambda r: tuple(r)) if name.endswith(".db") else (lambda r: tuple(sorted(r.items(), key=str)))
+    assert sorted(map(key, records)) == sorted(map(key, expected))
+
+def test_rerun_into_a_database_replaces_rows(inputs):
+    output = inputs / "out.db"
+    _run(inputs, output)
+    _run(inputs, output)
+    assert len(_db(output)) == 7 * len(ROLES)
@@ -0,0 +1,95 @@
+# test_db_utils.py
+import sqlite3
+import threading
+import pytest
+import db_utils
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_FILE", str(tmp_path / "results.db"))
+    db_utils.init_db()
+    yield db_utils
+    db_utils.get_pool().close()
+
+def _missing(db, result_id):
+    with db.get_pool().connection() as conn:
+        rows = conn.execute("SELECT skill FROM result_missing_skills WHERE result_id = ? ORDER BY skill", (result_id,))
+        return [skill for (skill,) in rows]
+
+def _rows(n, role="Data Analyst"):
+    return ({"resume_file": f"r{i}.pdf", "jd_file": "jd.txt", "role_title": role, "score": i % 10 * 10.0,
+             "verdict": "High" if i % 10 > 6 else "Low", "missing_skills": [f"s{i % 3}", "sql"]}
+            for i in range(n))
+
+def test_bulk_insert_links_missing_skills_to_their_rows(db):
+    # A generator spanning several chunks
+    assert db.save_results_many(_rows(25), chunk_size=10) == 25
+    db.save_result("solo.pdf", "jd.txt", "Data Analyst", 55, "Medium", ["docker"], "Remote")
+    rows = db.fetch_results()
+    assert len(rows) == 26
+    for row in rows:
+        expected = sorted(s.strip() for s in row[6].split(",") if s.strip())
+        assert _missing(db, row[0]) == expected
+
+def test_concurrent_writers_share_the_pool(db):
+    def write(n):
+        db.save_results_many(_rows(50, role=f"role{n}"))
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert db.summarize_results()["total"] == 300
+
+def test_keyed_rows_are_saved_once(db):
+    rows = [dict(row, source_key=f"job:1:{i}") for i, row in enumerate(_rows(5))]
+    assert db.save_results_many(rows) == 5
+    assert db.save_results_many(rows) == 0
+    changed = [dict(rows[0], score=99.0, missing_skills=["go"])]
+    assert db.save_results_many(changed, replace=True) == 1
+    results = db.fetch_results()
+    assert len(results) == 5
+    best = max(results, key=lambda row: row[4])
+    assert best[4] == 99.0 and _missing(db, best[0]) == ["go"]
+
+def test_migrates_a_version_1_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    db_utils._migrate_v1(conn)
+    conn.execute("INSERT INTO results (resume_file, jd_file, role_title, score, verdict, missing_skills, location) "
+                 "VALUES ('a.pdf', 'jd.txt', 'Dev', 40, 'Low', 'sql, docker', 'Pune')")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db_utils, "DB_FILE", path)
+    db_utils.init_db()
+    db_utils.init_db()  # already current: a no-op
+    with db_utils.get_pool().connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db_utils.SCHEMA_VERSION
+    rows, _ = db_utils.candidates_missing_skill("docker")
+    assert [row[1] for row in rows] == ["a.pdf"]
+    db_utils.get_pool().close()
+
+def test_keyset_pages_cover_every_row_once(db):
+    db.save_results_many(_rows(95))  # many ties on score
+    seen, after = [], None
+    while True:
+        rows, after = db.query_results(after=after, limit=10)
+        seen += rows
+        if after is None:
+            break
+    assert len(seen) == 95 and len({row[0] for row in seen}) == 95
+    assert [(row[4], row[0]) for row in seen] == sorted(((row[4], row[0]) for row in seen), reverse=True)
+    assert len(list(db.iter_results(page_size=7))) == 95
+
+def test_filters_and_aggregates(db):
+    db.save_results_many(_rows(30))
+    db.save_results_many(_rows(10, role="Engineer"))
+    rows = list(db.iter_results(role_title="Data Analyst", min_score=50, verdict="High"))
+    assert rows and all(row[3] == "Data Analyst" and row[4] >= 70 for row in rows)
+    assert len(list(db.iter_results(missing_skill="s1"))) == 13
+    assert db.distinct_values("role_title") == ["Data Analyst", "Engineer"]
+    assert db.summarize_results(role_title="Engineer")["total"] == 10
+    with pytest.raises(ValueError):
+        db.distinct_values("score")
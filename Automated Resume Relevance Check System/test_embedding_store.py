@@ -0,0 +1,95 @@
+# test_embedding_store.py
+import json
+import os
+import pickle
+import numpy as np
+import pytest
+import embedding_store
+from embedding_store import EmbeddingStore, EmbeddingStoreWriter, write_store
+
+DIM = 32
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+def _unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("dtype", embedding_store.DTYPES)
+def test_round_trip_and_exact_search(tmp_path, dtype):
+    vectors = _vectors(500)
+    ids = [f"r{i}" for i in range(500)]
+    meta = write_store(str(tmp_path), ids, vectors, dtype, model_name="test-model")
+    store = EmbeddingStore(str(tmp_path))
+    assert len(store) == 500 and store.dim == DIM and store.dtype == dtype
+    assert store.meta["model_name"] == "test-model" and store.accuracy == meta["accuracy"]
+    assert np.abs(store.get(["r3", "r7"]) - _unit(vectors)[[3, 7]]).max() < 0.02
+    assert store.accuracy["recall_at_10"] >= 0.9
+
+    query = _unit(vectors[:1])[0]
+    assert store.search(query, k=1)[0][0] == "r0"
+    # Block size does not change the result
+    assert store.search_many(query[None], k=10, block=64) == store.search_many(query[None], k=10)
+
+def test_streamed_chunks_equal_one_write(tmp_path):
+    vectors = _vectors(300)
+    with EmbeddingStoreWriter(str(tmp_path / "a")) as writer:
+        for start in range(0, 300, 70):
+            writer.add(range(start, min(start + 70, 300)), vectors[start:start + 70])
+    write_store(str(tmp_path / "b"), range(300), vectors)
+    a, b = EmbeddingStore(str(tmp_path / "a")), EmbeddingStore(str(tmp_path / "b"))
+    assert a.ids == b.ids
+    assert np.array_equal(a.vectors, b.vectors) and np.array_equal(a.scales, b.scales)
+
+def test_rejects_duplicates_and_bad_shapes(tmp_path):
+    writer = EmbeddingStoreWriter(str(tmp_path))
+    writer.add(["a"], _vectors(1))
+    with pytest.raises(ValueError):
+        writer.add(["a"], _vectors(1))
+    with pytest.raises(ValueError):
+        writer.add(["b"], np.ones((1, DIM + 1)))
+    with pytest.raises(ValueError):
+        EmbeddingStoreWriter(str(tmp_path / "x"), dtype="float64")
+
+def test_pickles_by_path(tmp_path):
+    write_store(str(tmp_path), ["a", "b"], _vectors(2))
+    store = pickle.loads(pickle.dumps(EmbeddingStore(str(tmp_path))))
+    assert store.ids == ["a", "b"]
+
+def test_rewrite_publishes_a_new_generation(tmp_path):
+    path = str(tmp_path)
+    write_store(path, range(10), _vectors(10), "int8")
+    old = EmbeddingStore(path)
+    write_store(path, range(20), _vectors(20, seed=1), "float16")
+    # A reader opened before the rewrite keeps its whole generation
+    assert len(old) == 10 and old.vectors.shape == (10, DIM) and old.dtype == "int8"
+    new = EmbeddingStore(path)
+    assert new.generation == old.generation + 1 and len(new) == 20 and new.scales is None
+    write_store(path, range(5), _vectors(5))
+    names = os.listdir(path)
+    # Current and previous generations only
+    assert sorted(n for n in names if n.startswith("vectors")) == [f"vectors.{g}.bin" for g in (2, 3)]
+
+def test_failed_write_leaves_the_store_untouched(tmp_path):
+    path = str(tmp_path)
+    write_store(path, ["a"], _vectors(1))
+    with pytest.raises(RuntimeError):
+        with EmbeddingStoreWriter(path) as writer:
+            writer.add(["b", "c"], _vectors(2))
+            raise RuntimeError("encoder failed")
+    assert EmbeddingStore(path).ids == ["a"]
+    assert not any(".2." in name for name in os.listdir(path))
+
+def test_reads_stores_written_before_generations(tmp_path):
+    path = str(tmp_path)
+    vectors = _vectors(4)
+    codes, scales = embedding_store.quantize(_unit(vectors), "int8")
+    codes.tofile(os.path.join(path, "vectors.bin"))
+    scales.tofile(os.path.join(path, "scales.bin"))
+    with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump(["a", "b", "c", "d"], f)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dtype": "int8", "dim": DIM, "count": 4}, f)
+    assert EmbeddingStore(path).search(_unit(vectors)[2], k=1)[0][0] == "c"
+    write_store(path, ["e"], _vectors(1))
+    assert EmbeddingStore(path).ids == ["e"]
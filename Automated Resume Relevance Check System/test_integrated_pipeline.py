@@ -0,0 +1,48 @@
+# test_integrated_pipeline.py
+import hashlib
+import numpy as np
+import pytest
+import integrated_pipeline
+
+class FakeModel:
+    """Deterministic stand-in for the sentence-transformer: one seeded vector per word, summed."""
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                seed = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+                vectors[i] += np.random.default_rng(seed).standard_normal(64).astype(np.float32)
+        return vectors
+
+SKILLS = ["Python", "SQL", "Power BI", "Machine Learning", "Docker", "Excel", "Statistics", "Java"]
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    monkeypatch.setattr(integrated_pipeline, "get_model", lambda: FakeModel())
+
+def _corpus(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = ["python", "sql", "docker", "excel", "java", "learning", "machine", "data", "team", "built"]
+    return [" ".join(rng.choice(words, size=40)) for _ in range(n)]
+
+def test_semantic_score_matrix_matches_per_pair(fake_model):
+    resumes = _corpus(30)
+    roles = [SKILLS[:3], SKILLS[2:7], SKILLS, []]
+    matrix = integrated_pipeline.semantic_score_matrix(resumes, roles)
+    for i, text in enumerate(resumes):
+        for j, skills in enumerate(roles):
+            # Summation order differs between the matrix product and the per-pair call
+            assert matrix[i, j] == pytest.approx(integrated_pipeline.semantic_similarity_jd_resume(skills, text),
+                                                 abs=0.011)
+
+def test_score_batch_matches_per_pair(fake_model):
+    resumes = _corpus(20, seed=1) + ["Python and Power BI dashboards"]
+    roles = [{"skills": SKILLS[:4]}, {"skills": SKILLS[3:]}]
+    rows = integrated_pipeline.score_batch(resumes, roles)
+    for text, row in zip(resumes, rows):
+        for role, scored in zip(roles, row):
+            skills = role["skills"]
+            assert scored["score"] == pytest.approx(
+                integrated_pipeline.compute_weighted_score(text, "", skills), abs=0.011)
+            assert scored["missing_skills"] == integrated_pipeline.hard_match_details(text, skills)[1]
@@ -0,0 +1,88 @@
+# test_job_queue.py
+import time
+import pytest
+import db_utils
+import job_queue
+from job_queue import JobRunner, JobStore
+
+ROLES = [{"role_title": "Analyst", "skills": ["SQL"]}, {"role_title": "Engineer", "skills": ["Go"]}]
+
+class Crash(BaseException):
+    """Stands in for the process dying: not an Exception, so run_job does not mark the job failed."""
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db_utils, "DB_FILE", str(tmp_path / "results.db"))
+    db_utils.init_db()
+    # Score without the embedding model: every resume gets one match per role
+    monkeypatch.setattr(job_queue, "get_raw_text", lambda path: f"text of {path}")
+    monkeypatch.setattr(job_queue, "parse_jd_text", lambda text: ROLES)
+    monkeypatch.setattr(job_queue, "match_with_manifest", lambda resumes, jd_roles, manifest: ({
+        f: [{"jd_file": "jd.txt", "role_title": role["role_title"], "score": 50.0, "verdict": "Medium",
+             "missing_skills": ["go"]} for role in ROLES]
+        for f in resumes
+    }, list(resumes)))
+    yield JobStore(str(tmp_path / "jobs.db"))
+    db_utils.get_pool().close()
+
+def _job(store, n=5):
+    return store.create_job("jd.txt", "jd.txt", [(f"r{i}.pdf", f"r{i}.pdf") for i in range(n)])
+
+def test_live_lease_is_not_claimed_twice(store):
+    job_id = _job(store)
+    assert store.claim_next("a", lease=60) == job_id
+    assert store.claim_next("b", lease=60) is None
+    assert store.renew_leases("a", lease=60) == 1
+
+def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(store):
+    job_id = _job(store)
+    assert store.claim_next("a", lease=0.01) == job_id
+    time.sleep(0.05)
+    assert store.claim_next("b", lease=60) == job_id
+    assert store.record_items(job_id, {0: ("r0.pdf", [])}, {}, owner="a") is False
+    assert len(store.pending_items(job_id)) == 5
+    store.finish_job(job_id, owner="a")
+    assert store.get_job(job_id)["status"] == "running"
+
+def test_release_requeues_the_job(store):
+    job_id = _job(store)
+    store.claim_next("a")
+    store.release(job_id, "a")
+    job = store.get_job(job_id)
+    assert job["status"] == "queued" and job["owner"] is None
+    assert store.claim_next("b") == job_id
+
+def test_recorded_items_are_not_recorded_again(store):
+    job_id = _job(store, 2)
+    store.claim_next("a")
+    matches = [{"role_title": "Analyst", "score": 10, "verdict": "Low", "missing_skills": []}]
+    assert store.record_items(job_id, {0: ("r0.pdf", matches)}, {1: "unreadable"}, owner="a")
+    assert store.record_items(job_id, {0: ("r0.pdf", matches)}, {1: "unreadable"}, owner="a")
+    assert store.get_job(job_id)["completed"] == 2
+    assert len(store.job_results(job_id)[0]) == 1
+    assert store.item_errors(job_id) == [("r1.pdf", "unreadable")]
+
+def test_crash_after_saving_results_adds_no_duplicates(store, monkeypatch):
+    job_id = _job(store, 5)
+    first = JobRunner(store, chunk_size=2, lease=0.01)
+    assert store.claim_next(first.owner, first.lease) == job_id
+
+    # The first runner saves the first chunk's results, then dies before recording the items
+    def crash(*args, **kwargs):
+        raise Crash()
+    monkeypatch.setattr(store, "record_items", crash)
+    with pytest.raises(Crash):
+        first.run_job(job_id)
+    del store.record_items  # back to JobStore.record_items
+    assert db_utils.summarize_results()["total"] == 4
+    assert store.get_job(job_id)["status"] == "running"
+
+    time.sleep(0.05)
+    second = JobRunner(store, chunk_size=2)
+    assert store.claim_next(second.owner, second.lease) == job_id
+    second.run_job(job_id)
+    job = store.get_job(job_id)
+    assert job["status"] == "done" and job["completed"] == 5
+    assert db_utils.summarize_results()["total"] == 10  # 5 resumes x 2 roles, each saved once
+    assert len(store.job_results(job_id)[0]) == 10
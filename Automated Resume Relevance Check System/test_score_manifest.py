@@ -0,0 +1,28 @@
+# test_score_manifest.py
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Print the role hashes of the bundled JDs in a fresh interpreter
+SCRIPT = """
+import os
+from parse_jds import parse_jd_file
+from score_manifest import role_hash
+for name in sorted(os.listdir("JDS")):
+    if name.endswith(".txt"):
+        for role in parse_jd_file(os.path.join("JDS", name)):
+            print(name, role_hash(role), role["skills"])
+"""
+
+def _role_hashes(seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    return subprocess.run([sys.executable, "-c", SCRIPT], cwd=HERE, env=env, capture_output=True,
+                          text=True, check=True).stdout
+
+def test_role_hash_is_stable_across_hash_seeds():
+    first = _role_hashes(1)
+    assert first.strip()
+    for seed in (2, 3):
+        assert _role_hashes(seed) == first
@@ -0,0 +1,67 @@
+# test_skill_index.py
+import sqlite3
+import instrumentation
+import skill_index
+from skill_index import SkillIndex
+
+RESUMES = {f"r{i}": f"Data analyst with Python and {'Docker' if i % 2 else 'SQL'} experience" for i in range(7)}
+
+def _index(tmp_path, **kwargs):
+    index = SkillIndex(str(tmp_path / "index.db"), text_loader=None, **kwargs)
+    index.add_resumes(RESUMES)
+    return index
+
+def test_top_candidates_ranks_by_hard_match(tmp_path):
+    index = _index(tmp_path, skills=["python", "docker", "sql"])
+    top = index.top_candidates({"role_title": "Dev", "skills": ["Python", "Docker"]}, k=3)
+    assert [c["resume_id"] for c in top] == ["r1", "r3", "r5"]
+    assert top[0]["score"] == 100.0 and top[0]["missing_skills"] == []
+    assert index.last_query_complete
+
+def test_new_skills_backfill_in_bounded_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_index, "BACKFILL_BATCH", 3)
+    index = _index(tmp_path, skills=["python"])
+    role = {"role_title": "Dev", "skills": ["Docker"]}
+    # 7 stored resumes, 3 scanned per query: complete on the third query
+    seen = []
+    for _ in range(3):
+        seen.append(({c["resume_id"] for c in index.top_candidates(role, k=10, backfill_budget=3)},
+                     index.last_query_complete))
+    assert seen == [({"r1"}, False), ({"r1", "r3", "r5"}, False), ({"r1", "r3", "r5"}, True)]
+    assert index.pending_skills() == set()
+
+def test_offline_backfill_finishes_all_pending_skills(tmp_path):
+    index = _index(tmp_path)
+    index.add_skills(["docker", "sql"])
+    assert index.pending_skills() == {"docker", "sql"}
+    assert index.backfill() == 0
+    top = index.top_candidates({"skills": ["SQL"]}, k=10, backfill_budget=0)
+    assert {c["resume_id"] for c in top} == {"r0", "r2", "r4", "r6"}
+
+def test_index_persists_and_reindexes_changed_resumes(tmp_path):
+    index = _index(tmp_path, skills=["docker", "sql"])
+    assert index.add_resumes(RESUMES) == 0
+    assert index.add_resume("r0", "Docker only")
+    index.close()
+    index = SkillIndex(str(tmp_path / "index.db"), text_loader=None)
+    top = index.top_candidates({"skills": ["Docker"]}, k=10)
+    assert {c["resume_id"] for c in top} == {"r0", "r1", "r3", "r5"}
+    index.remove_resume("r0")
+    assert "r0" not in {c["resume_id"] for c in index.top_candidates({"skills": ["Docker"]}, k=10)}
+
+def test_legacy_index_counts_unreadable_resumes(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE skills (skill_id INTEGER PRIMARY KEY, skill TEXT UNIQUE)")
+    conn.execute("CREATE TABLE resumes (resume_id TEXT PRIMARY KEY, content_hash TEXT)")
+    conn.executemany("INSERT INTO resumes VALUES (?, 'old')", [("gone.pdf",), ("kept.pdf",)])
+    conn.commit()
+    conn.close()
+    counts = {}
+    monkeypatch.setattr(instrumentation, "count", lambda name, n=1: counts.__setitem__(name, counts.get(name, 0) + n))
+
+    index = SkillIndex(path, text_loader=lambda resume_id: "python" if resume_id == "kept.pdf" else None)
+    top = index.top_candidates({"skills": ["Python"]}, k=10)
+    assert [c["resume_id"] for c in top] == ["kept.pdf"]
+    assert counts["skill_index.backfill_skipped"] == 1
+    assert "gone.pdf" in capsys.readouterr().out
@@ -0,0 +1,37 @@
+# test_skill_matcher.py
+import random
+from skill_matcher import SkillMatcher, get_matcher
+
+SKILLS = ["Python", "SQL", "MySQL", "Power BI", "Machine Learning", "Learning", "C", "C++", "Scikit-learn",
+          "Java", "JavaScript", "Excel", ""]
+
+def _naive(text, skills):
+    return {s.lower() for s in skills if s.lower() in text.lower()}
+
+def test_find_matches_substring_search():
+    rng = random.Random(0)
+    words = ["python", "mysql", "power", "bi", "machine", "learning", "c++", "javascript", "scikit-learn",
+             "excel", "team", "x", "sql", ",", "java"]
+    matcher = SkillMatcher(SKILLS)
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+        assert matcher.find(text) == _naive(text, SKILLS), text
+
+def test_overlapping_and_nested_skills():
+    # "mysql" contains "sql", "javascript" contains "java", "machine learning" contains "learning"
+    assert SkillMatcher(SKILLS).find("MySQL, JavaScript and Machine Learning") >= {
+        "mysql", "sql", "javascript", "java", "machine learning", "learning"}
+
+def test_whole_words():
+    matcher = SkillMatcher(["SQL", "Java", "Power BI"], whole_words=True)
+    assert matcher.find("MySQL and JavaScript") == set()
+    assert matcher.find("sql, java; Power BI.") == {"sql", "java", "power bi"}
+
+def test_match_keeps_order_and_duplicates():
+    matched, missing = get_matcher(["Excel", "Python", "Excel", "Go lang"]).match("python and excel")
+    assert matched == ["Excel", "Python", "Excel"]
+    assert missing == ["Go lang"]
+
+def test_get_matcher_reuses_compiled_matchers():
+    assert get_matcher(["Python", "SQL"]) is get_matcher(["Python", "SQL"])
+    assert get_matcher(["Python", "SQL"]) is not get_matcher(["Python", "SQL"], whole_words=True)
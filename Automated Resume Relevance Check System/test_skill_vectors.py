@@ -0,0 +1,37 @@
+# test_skill_vectors.py
+import random
+import numpy as np
+from integrated_pipeline import hard_match_details
+from skill_vectors import RoleSkillLayout, SkillVocabulary
+
+SKILLS = ["Python", "SQL", "MySQL", "Power BI", "Docker", "Excel", "Java", "Statistics"]
+
+def _resumes(n, seed=0):
+    rng = random.Random(seed)
+    words = ["python", "mysql", "power bi", "docker", "excel", "java", "team", "data", "statistics"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+
+def test_layout_matches_per_pair_hard_match():
+    roles = [SKILLS[:3], ["Excel", "excel", "Go"], [], SKILLS, ["Power BI"]]
+    resumes = _resumes(50)
+    layout = RoleSkillLayout(roles)
+    present = layout.present_slots(resumes)
+    scores = layout.hard_match_scores(present)
+    for i, text in enumerate(resumes):
+        for j, skills in enumerate(roles):
+            score, missing = hard_match_details(text, skills)
+            assert scores[i, j] == score
+            assert layout.missing_skills(present[i], j) == missing
+
+def test_vocabulary_is_case_insensitive():
+    vocabulary = SkillVocabulary(["Python", "python", "SQL"])
+    assert len(vocabulary) == 2
+    assert vocabulary.add("PYTHON") == 0
+    matrix = vocabulary.skill_matrix(["I write Python", "", "sql only"])
+    assert matrix.tolist() == [[True, False], [False, False], [False, True]]
+
+def test_empty_inputs():
+    layout = RoleSkillLayout([[], []])
+    scores = layout.hard_match_scores(layout.present_slots(["anything"]))
+    assert np.array_equal(scores, [[0.0, 0.0]])
+    assert RoleSkillLayout([["SQL"]]).present_slots([]).shape == (0, 1)
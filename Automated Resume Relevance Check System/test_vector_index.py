@@ -0,0 +1,78 @@
+# test_vector_index.py
+import numpy as np
+from vector_index import VectorIndex
+
+DIM = 16
+
+def _clustered(n, seed=0, centers=20):
+    rng = np.random.default_rng(seed)
+    means = rng.normal(size=(centers, DIM))
+    return means[rng.integers(centers, size=n)] + 0.3 * rng.normal(size=(n, DIM))
+
+def _exact(vectors, query, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return set(np.argsort(-(unit @ query))[:k].tolist())
+
+def test_brute_force_until_trained():
+    vectors = _clustered(50)
+    index = VectorIndex(DIM, train_size=100)
+    index.add(range(50), vectors)
+    assert index.centroids is None
+    query = vectors[7] / np.linalg.norm(vectors[7])
+    assert index.search(query, k=1)[0][0] == 7
+    assert {i for i, _ in index.search(query, k=5)} == _exact(vectors, query, 5)
+
+def test_recall_against_exact_search():
+    vectors = _clustered(3000)
+    index = VectorIndex(DIM, nprobe=8, train_size=500)
+    index.add(range(3000), vectors)
+    queries = _clustered(50, seed=1)
+    recall = np.mean([
+        len({i for i, _ in index.search(q / np.linalg.norm(q), k=10)} & _exact(vectors, q / np.linalg.norm(q), 10)) / 10
+        for q in queries
+    ])
+    assert recall >= 0.9
+    # nprobe == list count is exact
+    q = queries[0] / np.linalg.norm(queries[0])
+    assert {i for i, _ in index.search(q, k=10, nprobe=index.list_count)} == _exact(vectors, q, 10)
+
+def test_lists_grow_with_the_index():
+    index = VectorIndex(DIM, train_size=256)
+    for start in range(0, 8000, 500):
+        index.add(range(start, start + 500), _clustered(500, seed=start))
+    # Retrained as the live count doubled: about sqrt(N) lists, not sqrt(train_size)
+    assert index.trained_size >= 4000
+    assert index.list_count >= int(np.sqrt(4000))
+
+def test_explicit_list_count_is_kept():
+    index = VectorIndex(DIM, n_lists=7, train_size=100)
+    index.add(range(1000), _clustered(1000))
+    assert index.list_count == 7 and index.n_lists == 7
+
+def test_add_replaces_deletes_and_dedupes():
+    index = VectorIndex(DIM, train_size=10)
+    index.add([], [])
+    index.add(range(20), _clustered(20))
+    target = np.ones(DIM)
+    index.add(["a", "a"], np.stack([-target, target]))  # last one wins
+    assert len(index) == 21 and index.alive.sum() == 21
+    best_id, best_score = index.search(target / np.linalg.norm(target), k=1)[0]
+    assert best_id == "a" and abs(best_score - 1.0) < 1e-5
+    index.add([3], [target])
+    index.delete(["a", 5])
+    assert len(index) == 19
+    found = {i for i, _ in index.search(target / np.linalg.norm(target), k=19, nprobe=index.list_count)}
+    assert "a" not in found and 5 not in found and 3 in found
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = _clustered(600)
+    index = VectorIndex(DIM, train_size=200)
+    index.add([f"r{i}" for i in range(600)], vectors)
+    index.delete(["r0", "r1"])
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = VectorIndex.load(path)
+    assert len(loaded) == 598
+    assert loaded.list_count == index.list_count and loaded.trained_size == index.trained_size
+    query = vectors[9] / np.linalg.norm(vectors[9])
+    assert loaded.search(query, k=5) == index.search(query, k=5)
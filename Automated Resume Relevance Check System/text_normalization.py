@@ -0,0 +1,81 @@
+# text_normalization.py
+import hashlib
+import re
+from collections import OrderedDict, namedtuple
+import resources
+
+# -----------------------------
+# Precompiled patterns
+# -----------------------------
+NEWLINE_RE = re.compile(r'\n')
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+PAGE_NUMBER_RE = re.compile(r'Page \d+ of \d+', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+FAST_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+SECTION_KEYWORDS = ['skills', 'education', 'experience', 'projects', 'certifications']
+SECTION_KEYWORD_RE = re.compile("|".join(f"({k})" for k in SECTION_KEYWORDS), re.IGNORECASE)
+
+# -----------------------------
+# Stopwords and tokenizers
+# -----------------------------
+def get_stop_words():
+    """English stopwords as a frozenset, loaded once per process."""
+    return resources.get("stopwords")
+
+def fast_tokenize(text):
+    """Pure-Python tokenizer: runs of word characters and single punctuation marks.
+
+    Much cheaper than nltk.word_tokenize; it does not split contractions such
+    as "cannot".
+    """
+    return FAST_TOKEN_RE.findall(text)
+
+def tokenize(text, fast=False):
+    if fast:
+        return fast_tokenize(text)
+    return resources.get("word_tokenize")(text)
+
+# -----------------------------
+# Per-document normalization
+# -----------------------------
+NormalizedDocument = namedtuple("NormalizedDocument", ["lower", "tokens", "content_tokens", "clean"])
+
+_MAX_MEMO = 4096
+_memo = OrderedDict()  # (document hash, fast) -> NormalizedDocument, least recently used first
+
+def normalize_document(text, fast=False):
+    """Lowercased text, tokens, stopword-free tokens and cleaned text of a document.
+
+    Results are memoized by document hash, so every scorer that looks at the
+    same resume or JD shares one tokenization.
+    """
+    key = (hashlib.sha1(text.encode("utf-8")).hexdigest(), fast)
+    if key in _memo:
+        _memo.move_to_end(key)
+        return _memo[key]
+
+    lower = text.lower()
+    stripped = NON_ALNUM_RE.sub('', NEWLINE_RE.sub(' ', lower))
+    tokens = tokenize(stripped, fast)
+    stop_words = get_stop_words()
+    content_tokens = [t for t in tokens if t not in stop_words]
+    doc = NormalizedDocument(lower, tokens, content_tokens, ' '.join(content_tokens))
+
+    _memo[key] = doc
+    if len(_memo) > _MAX_MEMO:
+        _memo.popitem(last=False)
+    return doc
+
+# -----------------------------
+# Resume standardization
+# -----------------------------
+def standardize_resume_text(raw_text):
+    text = PAGE_NUMBER_RE.sub('', raw_text)
+    lines = [line.strip() for line in text.split('\n') if len(line.strip()) > 2]
+    text = '\n'.join(lines)
+    text = WHITESPACE_RE.sub(' ', text)
+    text = text.replace('•', '-').replace('·', '-').replace('*', '-')
+    # One pass upper-casing every section keyword
+    text = SECTION_KEYWORD_RE.sub(lambda m: SECTION_KEYWORDS[m.lastindex - 1].upper(), text)
+    return text
@@ -0,0 +1,76 @@
+# tfidf_model.py
+import os
+import pickle
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+TFIDF_FILE = "tfidf_model.pkl"  # fitted vectorizer saved for reuse
+TFIDF_VERSION = 1               # bump to refit saved models after changing how documents are prepared
+
+def kwargs_key(vectorizer_kwargs):
+    return repr(sorted(vectorizer_kwargs.items()))
+
+class CorpusTfidf:
+    """TF-IDF model fitted once on the whole resume + JD corpus.
+
+    Rows are L2-normalized, so cosine similarity for every resume x JD pair
+    is a single sparse matrix product. New documents go through transform()
+    with the corpus IDF weights; nothing is refitted.
+    """
+
+    def __init__(self, **vectorizer_kwargs):
+        self.vectorizer = TfidfVectorizer(**vectorizer_kwargs)
+        self.kwargs = kwargs_key(vectorizer_kwargs)
+        self.version = TFIDF_VERSION
+
+    def fit(self, documents):
+        self.vectorizer.fit(documents)
+        return self
+
+    def transform(self, documents):
+        return self.vectorizer.transform(documents)
+
+    def similarity_matrix(self, resume_texts, jd_texts):
+        """Cosine similarity (resumes x JDs) as a dense array."""
+        resumes = self.transform(resume_texts)
+        jds = self.transform(jd_texts)
+        return (resumes @ jds.T).toarray()
+
+    def similarity(self, jd_text, resume_text):
+        """Cosine similarity of one JD and one resume."""
+        return float(self.similarity_matrix([resume_text], [jd_text])[0, 0])
+
+    def save(self, path=TFIDF_FILE):
+        with open(path, "wb") as f:
+            pickle.dump({"vectorizer": self.vectorizer, "kwargs": self.kwargs, "version": self.version}, f)
+
+    @classmethod
+    def load(cls, path=TFIDF_FILE):
+        model = cls()
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if isinstance(saved, dict):
+            model.vectorizer = saved["vectorizer"]
+            model.kwargs = saved["kwargs"]
+            model.version = saved.get("version")
+        else:
+            # Files from before settings were stored: a bare vectorizer
+            model.vectorizer = saved
+            model.kwargs = model.version = None
+        return model
+
+def load_or_fit(documents, path=TFIDF_FILE, refit=False, **vectorizer_kwargs):
+    """Load the saved model at path, or fit one on documents and save it.
+
+    A saved model is reused as long as it was fitted with the same
+    vectorizer_kwargs and TFIDF_VERSION, even if documents has grown since:
+    new documents are scored through transform() with the saved IDF.
+    Pass refit=True to fit again on the current documents.
+    """
+    if os.path.exists(path) and not refit:
+        model = CorpusTfidf.load(path)
+        if model.kwargs == kwargs_key(vectorizer_kwargs) and model.version == TFIDF_VERSION:
+            return model
+        print(f"TF-IDF model {path} was saved with different settings or version; refitting")
+    model = CorpusTfidf(**vectorizer_kwargs).fit(documents)
+    model.save(path)
+    return model
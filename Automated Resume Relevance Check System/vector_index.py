@@ -0,0 +1,185 @@
+# vector_index.py
+import numpy as np
+
+INDEX_FILE = "resume_vectors.npz"  # on-disk copy of the resume vector index
+RETRAIN_GROWTH = 2.0               # retrain once the live count doubles since the last training
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class VectorIndex:
+    """NumPy-only IVF (inverted file) index over unit-normalized embeddings.
+
+    Vectors are clustered with spherical k-means; a query scores the
+    centroids, then only the vectors in the nprobe closest lists. nprobe is
+    the recall/speed knob: nprobe == n_lists is exact brute force. Until the
+    index holds train_size vectors it is searched brute force.
+
+    The index retrains each time the live count grows by RETRAIN_GROWTH
+    since the last training. Unless n_lists is given, each training uses
+    about sqrt(N) lists, so list sizes stay near sqrt(N) as N grows.
+    """
+
+    def __init__(self, dim, n_lists=None, nprobe=8, train_size=1024, seed=0):
+        self.dim = dim
+        self.n_lists = n_lists  # None: about sqrt(N) at each training
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.seed = seed
+        self.ids = []
+        self.id_rows = {}
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.assignments = np.zeros(0, dtype=np.int64)
+        self.centroids = None
+        self.trained_size = 0   # live vectors when the index was last trained
+        self._lists = None
+
+    def __len__(self):
+        return len(self.id_rows)
+
+    # -----------------------------
+    # Build / update
+    # -----------------------------
+    @property
+    def list_count(self):
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def add(self, ids, vectors):
+        """Add (or replace) vectors under the given ids; for ids repeated in one call the last wins."""
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = _normalize(vectors)
+        last = {id_: n for n, id_ in enumerate(ids)}
+        if len(last) < len(ids):
+            rows = sorted(last.values())
+            ids = [ids[n] for n in rows]
+            vectors = vectors[rows]
+        self.delete([i for i in ids if i in self.id_rows])
+        start = len(self.ids)
+        self.ids.extend(ids)
+        self.id_rows.update((id_, start + n) for n, id_ in enumerate(ids))
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        if self.centroids is not None:
+            new_assignments = self._assign(vectors)
+        else:
+            new_assignments = np.zeros(len(ids), dtype=np.int64)
+        self.assignments = np.concatenate([self.assignments, new_assignments])
+        self._lists = None
+        if self.centroids is None:
+            if len(self) >= self.train_size:
+                self.train()
+        elif len(self) >= self.trained_size * RETRAIN_GROWTH:
+            self.train()
+
+    def delete(self, ids):
+        """Remove vectors by id; storage is compacted once a third of it is dead."""
+        for id_ in ids:
+            row = self.id_rows.pop(id_, None)
+            if row is not None:
+                self.alive[row] = False
+        self._lists = None
+        if len(self.ids) and (~self.alive).sum() > len(self.ids) / 3:
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self.alive)
+        self.ids = [self.ids[i] for i in keep]
+        self.id_rows = {id_: n for n, id_ in enumerate(self.ids)}
+        self.vectors = self.vectors[keep]
+        self.alive = self.alive[keep]
+        self.assignments = self.assignments[keep]
+
+    def _assign(self, vectors, chunk=8192):
+        out = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, n_lists=None, iterations=10):
+        """Cluster the live vectors into n_lists lists (default: self.n_lists, else about sqrt(N))."""
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return
+        n_lists = n_lists or self.n_lists or max(1, int(np.sqrt(len(live))))
+        n_lists = min(n_lists, len(live))
+        rng = np.random.default_rng(self.seed)
+        data = self.vectors[live]
+        self.centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._assign(data)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, labels, data)
+            empty = ~np.bincount(labels, minlength=n_lists).astype(bool)
+            sums[empty] = self.centroids[empty]
+            self.centroids = _normalize(sums)
+        self.trained_size = len(live)
+        self.assignments = self._assign(self.vectors)
+        self._lists = None
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            live = np.flatnonzero(self.alive)
+            order = live[np.argsort(self.assignments[live], kind="stable")]
+            bounds = np.searchsorted(self.assignments[order], np.arange(self.list_count + 1))
+            self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(self.list_count)]
+        return self._lists
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def search(self, query, k=10, nprobe=None):
+        """Top-k (id, score) by dot product with query, best first.
+
+        Stored vectors are unit length, so a unit query gives cosine scores.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self.centroids is None:
+            candidates = np.flatnonzero(self.alive)
+        else:
+            nprobe = min(nprobe or self.nprobe, self.list_count)
+            probe = np.argsort(-(self.centroids @ query))[:nprobe]
+            lists = self._inverted_lists()
+            candidates = np.concatenate([lists[c] for c in probe])
+        if not len(candidates):
+            return []
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[candidates[i]], float(scores[i])) for i in top]
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path=INDEX_FILE):
+        self._compact()
+        np.savez(
+            path,
+            ids=np.array(self.ids, dtype=str),
+            vectors=self.vectors,
+            assignments=self.assignments,
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim), dtype=np.float32),
+            params=np.array([self.dim, self.n_lists or 0, self.nprobe, self.train_size, self.seed, self.trained_size])
+        )
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        data = np.load(path)
+        params = [int(x) for x in data["params"]]
+        dim, n_lists, nprobe, train_size, seed = params[:5]
+        index = cls(dim, n_lists or None, nprobe, train_size, seed)
+        index.ids = data["ids"].tolist()
+        index.id_rows = {id_: n for n, id_ in enumerate(index.ids)}
+        index.vectors = data["vectors"]
+        index.alive = np.ones(len(index.ids), dtype=bool)
+        index.assignments = data["assignments"]
+        index.centroids = data["centroids"] if len(data["centroids"]) else None
+        # Files from before trained_size was saved: count from the stored vectors
+        index.trained_size = params[5] if len(params) > 5 else (len(index.ids) if index.centroids is not None else 0)
+        return index
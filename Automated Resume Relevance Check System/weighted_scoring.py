@@ -50,8 +50,9 @@ def assign_verdict(score):
         return "Low"
 
 # ---------- Run ----------
-final_score = compute_relevance_score(hard_match_results, semantic_match_results)
-verdict = assign_verdict(final_score)
+if __name__ == "__main__":
+    final_score = compute_relevance_score(hard_match_results, semantic_match_results)
+    verdict = assign_verdict(final_score)
 
-print(f"Final Relevance Score: {final_score}")
-print(f"Verdict: {verdict}")
+    print(f"Final Relevance Score: {final_score}")
+    print(f"Verdict: {verdict}")